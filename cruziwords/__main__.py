@@ -1,13 +1,14 @@
 import argparse
 import logging
-from argparse import ArgumentParser, FileType
+from argparse import ArgumentParser
 from pathlib import Path
 
 from .examples import random_example
+from .fill import FillError, Template, fill_template
+from .log import configure_logging
 from .scoring import count_words, score_puzzle
-from .search import search_puzzle
+from .search import regenerate_puzzle, search_puzzle
 from .view.cli import print_solution
-from .view.html import render_puzzle
 from .words import WordsCorpus
 
 LOGGER = logging.getLogger(__file__)
@@ -19,23 +20,77 @@ def parse_args() -> argparse.Namespace:
         "csv_path", nargs="?", type=Path, default=random_example(), help="CSV file containing word definitions"
     )
     argp.add_argument("--max-iterations", type=int, help="Number of parallel random searches")
-    argp.add_argument("--html-out", type=FileType("w", encoding="utf-8"), help="Output board as HTML to this file")
-    return argp.parse_args()
+    argp.add_argument(
+        "--target-words", type=int, help="Aim for a puzzle with this many words, sampling them from a large corpus"
+    )
+    argp.add_argument("--workers", type=int, help="Explore the search tree with this many processes in parallel")
+    argp.add_argument("--weighted", action="store_true", help="The last column of the CSV file holds word weights")
+    argp.add_argument("--template", type=Path, help="Fill this fixed template, instead of growing a freeform puzzle")
+    argp.add_argument(
+        "--max-backtracks", type=int, default=100_000, help="Give up filling --template after this many backtracks"
+    )
+    argp.add_argument(
+        "--update", type=Path, help="Keep the layout of this puzzle, as written by --json-out, and add or remove words"
+    )
+    # Output files are only opened once the puzzle is ready, so that --json-out can overwrite the --update puzzle
+    argp.add_argument("--html-out", type=Path, help="Output board as HTML to this file")
+    argp.add_argument("--json-out", type=Path, help="Output board as JSON to this file")
+    argp.add_argument("-q", "--quiet", action="store_true", help="Only log warnings and errors")
+    argp.add_argument("--log-json", action="store_true", help="Log messages as JSON lines")
+    args = argp.parse_args()
+    if args.workers and args.target_words:
+        argp.error("--workers can't be combined with --target-words")
+    if args.update and (args.template or args.workers or args.target_words):
+        argp.error("--update can't be combined with --template, --workers or --target-words")
+    return args
 
 
 def main() -> None:
-    logging.basicConfig(level=logging.DEBUG, format="%(asctime)s\t%(levelname)s\t%(message)s")
     args = parse_args()
+    configure_logging(logging.WARNING if args.quiet else logging.DEBUG, structured=args.log_json)
 
     csv_path = args.csv_path
-    words = WordsCorpus.from_csv_file(csv_path)
+    words = WordsCorpus.from_csv_file(csv_path, weighted=args.weighted)
     LOGGER.debug("%d words loaded from %s", len(words), csv_path)
 
-    LOGGER.debug("Beginning search, max iterations: %s", args.max_iterations)
-    winning_puzzle = search_puzzle(words, score_puzzle, args.max_iterations)
+    if args.template:
+        template = Template.from_file(args.template)
+        LOGGER.debug("Filling template %s with %d words", args.template, len(template.slots))
+        try:
+            winning_puzzle = fill_template(template, words, args.max_backtracks)
+        except FillError as e:
+            LOGGER.error("%s", e)
+            raise SystemExit(1)
+    elif args.update:
+        from .view.json import load_puzzle_json
+
+        try:
+            previous_puzzle = load_puzzle_json(args.update.read_text(encoding="utf-8"))
+        except ValueError as e:
+            LOGGER.error("Can't read puzzle %s: %s", args.update, e)
+            raise SystemExit(1)
+        LOGGER.debug("Updating puzzle %s, max iterations: %s", args.update, args.max_iterations)
+        winning_puzzle = regenerate_puzzle(previous_puzzle, words, score_puzzle, args.max_iterations)
+    elif args.workers:
+        from .parallel import parallel_search_puzzle
+
+        LOGGER.debug("Beginning search with %d workers, max iterations: %s", args.workers, args.max_iterations)
+        winning_puzzle = parallel_search_puzzle(words, score_puzzle, args.max_iterations, args.workers)
+    else:
+        LOGGER.debug("Beginning search, max iterations: %s", args.max_iterations)
+        winning_puzzle = search_puzzle(words, score_puzzle, args.max_iterations, args.target_words)
     print_solution(winning_puzzle)
     LOGGER.debug("Placed %s words", count_words(winning_puzzle))
 
     if args.html_out:
-        args.html_out.write(render_puzzle(winning_puzzle))
-        LOGGER.debug("Wrote HTML output to %s", args.html_out.name)
+        # Mako is slow to import; only load it when we actually render HTML
+        from .view.html import render_puzzle
+
+        args.html_out.write_text(render_puzzle(winning_puzzle), encoding="utf-8")
+        LOGGER.debug("Wrote HTML output to %s", args.html_out)
+
+    if args.json_out:
+        from .view.json import render_puzzle_json
+
+        args.json_out.write_text(render_puzzle_json(winning_puzzle), encoding="utf-8")
+        LOGGER.debug("Wrote JSON output to %s", args.json_out)
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import aclosing
+from multiprocessing.managers import SyncManager
+from typing import AsyncGenerator, Mapping, Protocol, Self
+
+from .puzzle import Puzzle
+from .scoring import ScoreFuncType, score_puzzle
+from .search import iter_best_puzzles
+from .words import WordsCorpus
+
+LOGGER = logging.getLogger(__file__)
+
+
+class _Queue(Protocol):
+    def put(self, item: Puzzle | None) -> None: ...
+
+    def get(self) -> Puzzle | None: ...
+
+
+class _Event(Protocol):
+    def set(self) -> None: ...
+
+    def is_set(self) -> bool: ...
+
+
+# Corpora of this worker process, see `_init_worker`
+_worker_corpora: Mapping[str, WordsCorpus] = {}
+
+
+def _init_worker(corpora: Mapping[str, WordsCorpus]) -> None:
+    global _worker_corpora
+    _worker_corpora = corpora
+
+
+def _run_search(
+    corpus: WordsCorpus | str,
+    score_func: ScoreFuncType,
+    max_iterations: int | None,
+    target_words: int | None,
+    results: _Queue,
+    cancelled: _Event,
+) -> None:
+    """
+    Run a search in an executor, putting each new best puzzle in `results`, and `None` once it's done.
+    :param corpus: Words to search with, or the name of a corpus loaded by `_init_worker`.
+    :param cancelled: Stop searching once this is set; checked before expanding each puzzle.
+    """
+    try:
+        words = _worker_corpora[corpus] if isinstance(corpus, str) else corpus
+        for puzzle in iter_best_puzzles(words, score_func, max_iterations, target_words, cancelled.is_set):
+            results.put(puzzle)
+        if cancelled.is_set():
+            LOGGER.debug("Search cancelled")
+    finally:
+        results.put(None)
+
+
+class PuzzleGenerator:
+    """
+    Generate puzzles from asyncio code, without blocking the event loop. Searches run in a thread or process pool, and
+    can be cancelled or timed out like any other coroutine.
+
+    Corpora are loaded once, and referred to by name. With a process pool, each worker process receives them once when
+    it starts, rather than with every search.
+
+        async with PuzzleGenerator({"capitals": WordsCorpus.from_csv_file(path)}, processes=True) as generator:
+            puzzle = await generator.generate("capitals", timeout=5)
+    """
+
+    def __init__(self, corpora: Mapping[str, WordsCorpus], processes: bool = False, max_workers: int | None = None):
+        """
+        :param corpora: Corpora to generate puzzles from, by name.
+        :param processes: Run searches in worker processes instead of threads. Searches are CPU-bound, so only then can
+        several of them run in parallel.
+        :param max_workers: Maximum number of searches running at once. Further searches wait for a free worker.
+        """
+        self.corpora = dict(corpora)
+        self.executor: Executor
+        self.manager: SyncManager | None
+        if processes:
+            context = multiprocessing.get_context("spawn")
+            self.executor = ProcessPoolExecutor(
+                max_workers, mp_context=context, initializer=_init_worker, initargs=(self.corpora,)
+            )
+            # Queues and events to talk to a running search have to be shared through a manager process
+            self.manager = context.Manager()
+        else:
+            self.executor = ThreadPoolExecutor(max_workers)
+            self.manager = None
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Shut down the executor. Searches still running are cancelled.
+        """
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        if self.manager is not None:
+            self.manager.shutdown()
+
+    async def iter_puzzles(
+        self,
+        corpus: str,
+        max_iterations: int | None = None,
+        target_words: int | None = None,
+        score_func: ScoreFuncType = score_puzzle,
+    ) -> AsyncGenerator[Puzzle, None]:
+        """
+        Search for a puzzle, yielding each new best puzzle as soon as it's found. Stop iterating, or cancel the task
+        iterating, to stop the search.
+        :param corpus: Name of the corpus to use.
+        :param max_iterations: Stop finding a more desirable puzzle after this many iterations.
+        :param target_words: Aim for a puzzle with this many words, see `search_puzzle`.
+        :param score_func: Callable to assign a desirability score to puzzle. Must be picklable if using processes.
+        :return: Yields puzzles of increasing score.
+        """
+        if corpus not in self.corpora:
+            raise KeyError(f"Unknown corpus {corpus!r}")
+
+        results: _Queue
+        cancelled: _Event
+        if self.manager is not None:
+            results, cancelled = self.manager.Queue(), self.manager.Event()
+            words: WordsCorpus | str = corpus
+        else:
+            results, cancelled = queue.Queue(), threading.Event()
+            words = self.corpora[corpus]
+
+        future = self.executor.submit(_run_search, words, score_func, max_iterations, target_words, results, cancelled)
+        try:
+            while (puzzle := await asyncio.to_thread(results.get)) is not None:
+                yield puzzle
+        finally:
+            cancelled.set()
+            if future.cancel():
+                # The search never started, so it won't release the thread waiting for results
+                results.put(None)
+        # Raise any exception of the search
+        await asyncio.wrap_future(future)
+
+    async def generate(
+        self,
+        corpus: str,
+        max_iterations: int | None = None,
+        target_words: int | None = None,
+        score_func: ScoreFuncType = score_puzzle,
+        timeout: float | None = None,
+    ) -> Puzzle:
+        """
+        Create a nice puzzle, like `search_puzzle`.
+        :param corpus: Name of the corpus to use.
+        :param max_iterations: Stop finding a more desirable puzzle after this many iterations.
+        :param target_words: Aim for a puzzle with this many words, see `search_puzzle`.
+        :param score_func: Callable to assign a desirability score to puzzle. Must be picklable if using processes.
+        :param timeout: Stop searching after this many seconds, and return the best puzzle found so far. Raises
+        `TimeoutError` if none was found yet.
+        :return: The best puzzle discovered by this search.
+        """
+        best_puzzle = None
+        try:
+            async with asyncio.timeout(timeout):
+                async with aclosing(self.iter_puzzles(corpus, max_iterations, target_words, score_func)) as puzzles:
+                    async for best_puzzle in puzzles:
+                        pass
+        except TimeoutError:
+            if best_puzzle is None:
+                raise
+            LOGGER.debug("Search timed out after %s seconds", timeout)
+
+        assert best_puzzle is not None
+        return best_puzzle
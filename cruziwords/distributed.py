@@ -0,0 +1,321 @@
+import argparse
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing.managers import BaseManager
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+from .log import configure_logging
+from .puzzle import Puzzle
+from .scoring import score_puzzle
+from .search import search_puzzle
+from .view.cli import print_solution
+from .words import Word, WordsCorpus
+
+LOGGER = logging.getLogger(__file__)
+
+DEFAULT_PORT = 8765
+
+# Shared secret to authenticate workers with, unless given on the command line
+AUTHKEY_ENV_VAR = "CRUZIWORDS_AUTHKEY"
+
+
+class SearchTask(NamedTuple):
+    """
+    One independent search, as run by a worker: `search_puzzle` with a given random seed.
+    """
+
+    task_id: int
+    seed: int
+    max_iterations: int | None
+
+
+class Job(NamedTuple):
+    """
+    What workers need to know to run any of the coordinator's tasks.
+    """
+
+    words: list[Word]
+    target_words: int | None
+
+
+class Coordinator:
+    """
+    Hands out search tasks to workers, and collects their results. Workers send heartbeats while running a task; if a
+    worker goes quiet for too long, its task is handed to another worker.
+
+    All methods are called by workers over the network (see `start_coordinator`), so they need to be thread-safe.
+    """
+
+    def __init__(self, job: Job, tasks: list[SearchTask], heartbeat_timeout: float = 10.0):
+        """
+        :param job: Corpus and search parameters shared by all tasks.
+        :param tasks: Tasks to run.
+        :param heartbeat_timeout: Reassign a task if its worker hasn't sent a heartbeat for this many seconds.
+        """
+        self.job = job
+        self.heartbeat_timeout = heartbeat_timeout
+
+        self.lock = threading.Condition()
+        self.pending = list(reversed(tasks))
+        # Task ID -> (task, worker ID, time of last heartbeat)
+        self.running: dict[int, tuple[SearchTask, int, float]] = {}
+        self.results: dict[int, tuple[float, Puzzle]] = {}
+        self.total_tasks = len(tasks)
+        self.next_worker_id = 0
+
+    def register_worker(self) -> int:
+        """
+        :return: A new worker ID.
+        """
+        with self.lock:
+            self.next_worker_id += 1
+            LOGGER.debug("Worker %d registered", self.next_worker_id)
+            return self.next_worker_id
+
+    def get_job(self) -> Job:
+        return self.job
+
+    def get_task(self, worker_id: int) -> SearchTask | None:
+        """
+        :return: The next task for this worker to run, or `None` if there's none right now.
+        """
+        with self.lock:
+            if not self.pending:
+                return None
+            task = self.pending.pop()
+            self.running[task.task_id] = (task, worker_id, time.monotonic())
+            LOGGER.debug("Task %d assigned to worker %d", task.task_id, worker_id)
+            return task
+
+    def heartbeat(self, worker_id: int, task_id: int) -> None:
+        with self.lock:
+            if (running := self.running.get(task_id)) and running[1] == worker_id:
+                self.running[task_id] = (running[0], worker_id, time.monotonic())
+
+    def submit_result(self, worker_id: int, task_id: int, score: float, puzzle: Puzzle) -> None:
+        """
+        Record the result of a task. If the task was reassigned in the meantime, the first result wins.
+        """
+        with self.lock:
+            if task_id in self.results:
+                return
+            self.results[task_id] = (score, puzzle)
+            self.running.pop(task_id, None)
+            self.pending = [task for task in self.pending if task.task_id != task_id]
+            LOGGER.debug("Task %d finished by worker %d with score %.4f", task_id, worker_id, score)
+            self.lock.notify_all()
+
+    def finished_tasks(self) -> list[int]:
+        with self.lock:
+            return list(self.results)
+
+    def finished(self) -> bool:
+        """
+        :return: Whether all tasks have finished. Workers should exit then.
+        """
+        with self.lock:
+            return len(self.results) == self.total_tasks
+
+    def reassign_stale_tasks(self) -> list[int]:
+        """
+        Put tasks whose worker hasn't sent a heartbeat in time back in the queue.
+        :return: IDs of the reassigned tasks.
+        """
+        with self.lock:
+            now = time.monotonic()
+            stale = [
+                task_id
+                for task_id, (_, _, last_heartbeat) in self.running.items()
+                if now - last_heartbeat > self.heartbeat_timeout
+            ]
+            for task_id in stale:
+                task, worker_id, _ = self.running.pop(task_id)
+                self.pending.append(task)
+                LOGGER.warning("Worker %d went quiet; reassigning task %d", worker_id, task_id)
+            return stale
+
+    def wait(self, poll_interval: float = 1.0) -> Puzzle:
+        """
+        Block until all tasks have finished, reassigning tasks of workers which went quiet.
+        :return: The best puzzle found by any task.
+        """
+        while not self.finished():
+            self.reassign_stale_tasks()
+            with self.lock:
+                self.lock.wait(poll_interval)
+
+        _, best_puzzle = max(self.results.values(), key=lambda result: result[0])
+        return best_puzzle
+
+
+# The coordinator served by this process, see `start_coordinator`
+_coordinator: Coordinator | None = None
+
+
+def _init_coordinator(job: Job, tasks: list[SearchTask], heartbeat_timeout: float) -> None:
+    global _coordinator
+    _coordinator = Coordinator(job, tasks, heartbeat_timeout)
+
+
+def _get_coordinator() -> Coordinator | None:
+    return _coordinator
+
+
+class CoordinatorManager(BaseManager):
+    """
+    Exposes a `Coordinator` to workers over TCP.
+    """
+
+
+CoordinatorManager.register("get_coordinator", callable=_get_coordinator)
+
+
+@contextmanager
+def start_coordinator(
+    job: Job,
+    tasks: list[SearchTask],
+    address: tuple[str, int],
+    authkey: bytes,
+    heartbeat_timeout: float = 10.0,
+) -> Iterator[tuple[Coordinator, tuple[str, int]]]:
+    """
+    Start a server process holding a `Coordinator`, which workers can connect to while in this context.
+    :param job: Corpus and search parameters shared by all tasks.
+    :param tasks: Tasks to run.
+    :param address: Host and port to listen on. Port 0 picks a free port.
+    :param authkey: Shared secret which workers need to know.
+    :param heartbeat_timeout: Reassign a task if its worker hasn't sent a heartbeat for this many seconds.
+    :return: Tuple of (proxy to the coordinator, address it's listening on).
+    """
+    manager = CoordinatorManager(address=address, authkey=authkey)
+    manager.start(initializer=_init_coordinator, initargs=(job, tasks, heartbeat_timeout))
+    try:
+        yield manager.get_coordinator(), manager.address  # type: ignore[attr-defined, misc]
+    finally:
+        manager.shutdown()
+
+
+def run_worker(
+    address: tuple[str, int],
+    authkey: bytes,
+    heartbeat_interval: float = 2.0,
+    poll_interval: float = 1.0,
+) -> None:
+    """
+    Connect to a coordinator, and run the tasks it hands out until all of its tasks are finished.
+    :param address: Host and port of the coordinator.
+    :param authkey: Shared secret of the coordinator.
+    :param heartbeat_interval: Send heartbeats to the coordinator this often while running a task.
+    :param poll_interval: If there's no task right now, ask again after this many seconds.
+    """
+    manager = CoordinatorManager(address=address, authkey=authkey)
+    manager.connect()
+    coordinator = manager.get_coordinator()  # type: ignore[attr-defined]
+
+    worker_id = coordinator.register_worker()
+    job = coordinator.get_job()
+    words = WordsCorpus(job.words)
+    LOGGER.debug("Worker %d received %d words", worker_id, len(words))
+
+    try:
+        while not coordinator.finished():
+            task = coordinator.get_task(worker_id)
+            if task is None:
+                time.sleep(poll_interval)
+                continue
+
+            # Proxies open a separate connection for each thread, so we can send heartbeats while searching
+            done = threading.Event()
+
+            def send_heartbeats() -> None:
+                while not done.wait(heartbeat_interval):
+                    coordinator.heartbeat(worker_id, task.task_id)
+
+            heartbeat_thread = threading.Thread(target=send_heartbeats, daemon=True)
+            heartbeat_thread.start()
+            try:
+                random.seed(task.seed)
+                puzzle = search_puzzle(words, score_puzzle, task.max_iterations, job.target_words)
+            finally:
+                done.set()
+                heartbeat_thread.join()
+
+            coordinator.submit_result(worker_id, task.task_id, score_puzzle(puzzle), puzzle)
+    except (EOFError, ConnectionError):
+        # The coordinator has shut down, because all tasks are finished
+        pass
+
+    LOGGER.debug("Worker %d exiting", worker_id)
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    host, _, port = address.rpartition(":")
+    return host or "localhost", int(port) if port else DEFAULT_PORT
+
+
+def parse_args() -> argparse.Namespace:
+    argp = argparse.ArgumentParser("Cruziwords distributed search!")
+    argp.add_argument("--authkey", help=f"Shared secret of coordinator and workers (default: ${AUTHKEY_ENV_VAR})")
+    argp.add_argument("--log-json", action="store_true", help="Log messages as JSON lines")
+    subparsers = argp.add_subparsers(dest="mode", required=True)
+
+    coordinator_argp = subparsers.add_parser("coordinator", help="Hand out search tasks and collect the best result")
+    coordinator_argp.add_argument("csv_path", type=Path, help="CSV file containing word definitions")
+    coordinator_argp.add_argument("--listen", default=f"0.0.0.0:{DEFAULT_PORT}", help="Address to listen on")
+    coordinator_argp.add_argument("--tasks", type=int, default=10, help="Number of independent searches")
+    coordinator_argp.add_argument("--max-iterations", type=int, default=100, help="Iterations per search")
+    coordinator_argp.add_argument("--target-words", type=int, help="Aim for a puzzle with this many words")
+    coordinator_argp.add_argument("--weighted", action="store_true", help="The last CSV column holds word weights")
+    coordinator_argp.add_argument(
+        "--heartbeat-timeout", type=float, default=10.0, help="Reassign tasks of workers quiet for this many seconds"
+    )
+    coordinator_argp.add_argument("--html-out", type=Path, help="Output board as HTML to this file")
+
+    worker_argp = subparsers.add_parser("worker", help="Run search tasks handed out by a coordinator")
+    worker_argp.add_argument("coordinator", nargs="?", default=f"localhost:{DEFAULT_PORT}", help="Coordinator address")
+
+    args = argp.parse_args()
+    if args.mode == "coordinator" and args.tasks < 1:
+        argp.error("--tasks must be at least 1")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    configure_logging(structured=args.log_json)
+
+    authkey = args.authkey or os.environ.get(AUTHKEY_ENV_VAR)
+    if not authkey:
+        raise SystemExit(f"Pass --authkey or set ${AUTHKEY_ENV_VAR}")
+
+    if args.mode == "worker":
+        run_worker(parse_address(args.coordinator), authkey.encode())
+        return
+
+    words = WordsCorpus.from_csv_file(args.csv_path, weighted=args.weighted)
+    seed = random.randrange(2**32)
+    tasks = [SearchTask(i, seed + i, args.max_iterations) for i in range(args.tasks)]
+    with start_coordinator(
+        Job(list(words), args.target_words),
+        tasks,
+        parse_address(args.listen),
+        authkey.encode(),
+        args.heartbeat_timeout,
+    ) as (coordinator, address):
+        LOGGER.info("Coordinator listening on %s:%d with %d tasks", *address, len(tasks))
+        winning_puzzle = coordinator.wait()
+
+    print_solution(winning_puzzle)
+    if args.html_out:
+        from .view.html import render_puzzle
+
+        args.html_out.write_text(render_puzzle(winning_puzzle), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import random
+from collections import deque
+from functools import reduce
+from pathlib import Path
+from typing import Iterable, NamedTuple, Self
+
+from .puzzle import Direction, Position, Puzzle
+from .words import Word, WordsCorpus, normalize
+
+# Characters used in template files
+ACROSS_CLUE = ">"
+DOWN_CLUE = "v"
+OPEN_SQUARE = "."
+EMPTY_SQUARES = "# "
+
+
+class TemplateError(ValueError):
+    """
+    Raised when a template file is malformed.
+    """
+
+
+class FillError(Exception):
+    """
+    Raised when a template can't be filled with the words of a corpus.
+    """
+
+
+class Slot(NamedTuple):
+    """
+    A word to be filled in on a template: the clue square in front of it, its direction, and its length.
+    """
+
+    start_pos: Position
+    dir: Direction
+    length: int
+
+    def position(self, i: int) -> Position:
+        """
+        :return: Position of the i'th letter of this slot.
+        """
+        return self.start_pos.move(i + 1, self.dir)
+
+
+class Template:
+    """
+    A fixed grid to be filled with words. As on the puzzles generated by `search_puzzle`, every word is preceded by a
+    square holding its clue, which points in the direction the word goes. A template file marks these squares with `>`
+    (across) and `v` (down). Squares to be filled are marked with `.`, or with an uppercase letter if it's given in
+    advance; lowercase letters aren't accepted, as `v` would be ambiguous. `#` or space marks empty squares. For
+    example:
+
+        >....
+        #v#v#
+        >....
+    """
+
+    def __init__(self, letters: dict[Position, str | None], slots: list[Slot]):
+        """
+        :param letters: Squares to be filled, mapped to their given letter, or `None`.
+        :param slots: Words to be filled in.
+        """
+        self.letters = letters
+        self.slots = slots
+
+    @classmethod
+    def from_string(cls, template_string: str) -> Self:
+        """
+        Parse a template, see the class docstring for its format.
+        :param template_string: A template file read in memory.
+        """
+        letters: dict[Position, str | None] = {}
+        clues: list[tuple[Position, Direction]] = []
+
+        for row, line in enumerate(template_string.splitlines()):
+            for col, char in enumerate(line):
+                pos = Position(col, row)
+                if char == ACROSS_CLUE:
+                    clues.append((pos, Direction.ACROSS))
+                elif char == DOWN_CLUE:
+                    clues.append((pos, Direction.DOWN))
+                elif char == OPEN_SQUARE:
+                    letters[pos] = None
+                elif char.isalpha() and not char.isupper():
+                    raise TemplateError(f"Given letter {char!r} at {pos} should be uppercase")
+                elif char.isalpha():
+                    given_letter = normalize(char)
+                    if len(given_letter) != 1:
+                        raise TemplateError(f"Letter {char!r} at {pos} doesn't fit a single square")
+                    letters[pos] = given_letter
+                elif char not in EMPTY_SQUARES:
+                    raise TemplateError(f"Unexpected character {char!r} at {pos}")
+
+        slots = []
+        for start_pos, dir in clues:
+            length = 0
+            while start_pos.move(length + 1, dir) in letters:
+                length += 1
+            if not length:
+                raise TemplateError(f"Clue at {start_pos} isn't followed by any squares to fill")
+            slots.append(Slot(start_pos, dir, length))
+
+        covered = {slot.position(i) for slot in slots for i in range(slot.length)}
+        if uncovered := letters.keys() - covered:
+            raise TemplateError(f"Squares {sorted(uncovered)} don't belong to any word")
+
+        return cls(letters, slots)
+
+    @classmethod
+    def from_file(cls, template_path: str | Path) -> Self:
+        """
+        Parse a template from a file, see the class docstring for its format.
+        :param template_path: Path to template file.
+        """
+        with open(template_path, "r", encoding="utf-8") as template_file:
+            return cls.from_string(template_file.read())
+
+
+class SolutionIndex:
+    """
+    Solutions of a corpus, grouped by length. For each length, position and letter, a bitset of the solutions having
+    that letter at that position is precomputed. Sets of candidate solutions for a slot are represented as bitsets, too,
+    so that narrowing them down is a matter of a few bitwise operations on (large) integers.
+    """
+
+    def __init__(self, words: Iterable[Word], lengths: Iterable[int]):
+        """
+        :param words: Words to fill templates with.
+        :param lengths: Only index solutions of these lengths.
+        """
+        lengths = set(lengths)
+        self.words_by_solution: dict[str, list[Word]] = {}
+        for word in words:
+            if len(word) in lengths:
+                self.words_by_solution.setdefault(word.solution, []).append(word)
+
+        self.solutions: dict[int, list[str]] = {length: [] for length in lengths}
+        for solution in self.words_by_solution:
+            self.solutions[len(solution)].append(solution)
+
+        # For each length: a list, containing for each position a mapping of letters to bitsets
+        self.masks: dict[int, list[dict[str, int]]] = {}
+        for length, solutions in self.solutions.items():
+            bit_arrays: list[dict[str, bytearray]] = [{} for _ in range(length)]
+            for index, solution in enumerate(solutions):
+                for i, letter in enumerate(solution):
+                    bit_array = bit_arrays[i].get(letter)
+                    if bit_array is None:
+                        bit_array = bit_arrays[i][letter] = bytearray(len(solutions) // 8 + 1)
+                    bit_array[index // 8] |= 1 << index % 8
+            self.masks[length] = [
+                {letter: int.from_bytes(bit_array, "little") for letter, bit_array in position_arrays.items()}
+                for position_arrays in bit_arrays
+            ]
+
+    def all(self, length: int) -> int:
+        """
+        :return: Bitset of all solutions of this length.
+        """
+        return (1 << len(self.solutions[length])) - 1
+
+    def with_letter(self, length: int, i: int, letter: str) -> int:
+        """
+        :return: Bitset of all solutions of this length which have `letter` at position `i`.
+        """
+        return self.masks[length][i].get(letter, 0)
+
+    def support(self, length: int, i: int, candidates: int, other_length: int, j: int) -> int:
+        """
+        Given candidates for a slot, which solutions of a crossing slot remain possible?
+        :param length: Length of the slot.
+        :param i: Position in the slot where the other slot crosses it.
+        :param candidates: Bitset of candidate solutions for the slot.
+        :param other_length: Length of the crossing slot.
+        :param j: Position in the crossing slot where it crosses the slot.
+        :return: Bitset of solutions of the crossing slot which agree with at least one candidate at the crossing.
+        """
+        other_masks = self.masks[other_length][j]
+        supported = 0
+        for letter, mask in self.masks[length][i].items():
+            if candidates & mask and letter in other_masks:
+                supported |= other_masks[letter]
+        return supported
+
+
+def set_bits(bitset: int) -> list[int]:
+    """
+    :return: Indices of the bits which are set.
+    """
+    bits = bin(bitset)[:1:-1]
+    return [i for i, bit in enumerate(bits) if bit == "1"]
+
+
+class TemplateFiller:
+    """
+    Backtracking search for a fill of a template. Candidate solutions for each slot are narrowed down by enforcing arc
+    consistency between crossing slots, and the slot with the fewest candidates is filled first.
+    """
+
+    def __init__(self, template: Template, index: SolutionIndex, max_backtracks: int | None = None):
+        """
+        :param template: Template to fill.
+        :param index: Solutions to fill it with.
+        :param max_backtracks: Give up after backtracking this many times.
+        """
+        self.template = template
+        self.index = index
+        self.max_backtracks = max_backtracks
+        self.backtracks = 0
+
+        slots = template.slots
+        self.slots_by_length: dict[int, list[int]] = {}
+        for s, slot in enumerate(slots):
+            self.slots_by_length.setdefault(slot.length, []).append(s)
+
+        # For each slot: (position in this slot, crossing slot, position in crossing slot)
+        slot_letters: dict[Position, list[tuple[int, int]]] = {}
+        for s, slot in enumerate(slots):
+            for i in range(slot.length):
+                slot_letters.setdefault(slot.position(i), []).append((s, i))
+        self.crossings: list[list[tuple[int, int, int]]] = [[] for _ in slots]
+        for occupants in slot_letters.values():
+            for s, i in occupants:
+                for t, j in occupants:
+                    if s != t:
+                        self.crossings[s].append((i, t, j))
+
+    def initial_domains(self) -> list[int]:
+        domains = []
+        for slot in self.template.slots:
+            domain = self.index.all(slot.length)
+            for i in range(slot.length):
+                if given_letter := self.template.letters[slot.position(i)]:
+                    domain &= self.index.with_letter(slot.length, i, given_letter)
+            domains.append(domain)
+        return domains
+
+    def propagate(self, domains: list[int], changed: Iterable[int]) -> bool:
+        """
+        Remove candidates which don't agree with any candidate of a crossing slot, until no more can be removed.
+        :param domains: Candidate bitsets for each slot; modified in place.
+        :param changed: Slots whose candidates have changed.
+        :return: False if some slot has no candidates left.
+        """
+        slots = self.template.slots
+        queue = deque(changed)
+        queued = set(queue)
+        while queue:
+            s = queue.popleft()
+            queued.discard(s)
+            for i, t, j in self.crossings[s]:
+                supported = self.index.support(slots[s].length, i, domains[s], slots[t].length, j)
+                narrowed = domains[t] & supported
+                if narrowed != domains[t]:
+                    if not narrowed:
+                        return False
+                    domains[t] = narrowed
+                    if t not in queued:
+                        queue.append(t)
+                        queued.add(t)
+        return True
+
+    def solve(self, domains: list[int], assigned: dict[int, int]) -> dict[int, int] | None:
+        """
+        :param domains: Candidate bitsets for each slot.
+        :param assigned: Solution index chosen for each slot filled so far.
+        :return: Solution index for every slot, or `None` if there's no fill.
+        """
+        unassigned = [s for s in range(len(domains)) if s not in assigned]
+        if not unassigned:
+            return assigned
+
+        # Most constrained slot first
+        s = min(unassigned, key=lambda s: domains[s].bit_count())
+        candidates = set_bits(domains[s])
+        random.shuffle(candidates)
+
+        for candidate in candidates:
+            if self.max_backtracks is not None and self.backtracks > self.max_backtracks:
+                raise FillError(f"Gave up after {self.backtracks} backtracks")
+
+            bit = 1 << candidate
+            new_domains = domains.copy()
+            new_domains[s] = bit
+            changed = [s]
+
+            # Each solution may only be used once
+            consistent = True
+            for t in self.slots_by_length[self.template.slots[s].length]:
+                if t != s and new_domains[t] & bit:
+                    new_domains[t] &= ~bit
+                    changed.append(t)
+                    consistent = consistent and bool(new_domains[t])
+
+            if consistent and self.propagate(new_domains, changed):
+                if (result := self.solve(new_domains, assigned | {s: candidate})) is not None:
+                    return result
+
+            self.backtracks += 1
+
+        return None
+
+    def fill(self) -> dict[Slot, str]:
+        """
+        :return: A solution for each slot. Raises `FillError` if no fill exists.
+        """
+        domains = self.initial_domains()
+        if not all(domains) or not self.propagate(domains, range(len(domains))):
+            raise FillError("Template can't be filled with these words")
+
+        assigned = self.solve(domains, {})
+        if assigned is None:
+            raise FillError("Template can't be filled with these words")
+
+        slots = self.template.slots
+        return {slots[s]: self.index.solutions[slots[s].length][candidate] for s, candidate in assigned.items()}
+
+
+def fill_template(template: Template, words: WordsCorpus, max_backtracks: int | None = None) -> Puzzle:
+    """
+    Fill a fixed template with words from a corpus.
+    :param template: Template to fill.
+    :param words: Words to fill it with. Each word is used at most once.
+    :param max_backtracks: Give up after backtracking this many times.
+    :return: The filled puzzle. Raises `FillError` if the template can't be filled.
+    """
+    index = SolutionIndex(words, {slot.length for slot in template.slots})
+    filled_slots = TemplateFiller(template, index, max_backtracks).fill()
+
+    puzzle = Puzzle()
+    for slot, solution in filled_slots.items():
+        # Several words may share a solution; combine their clues, so that one is picked like for any other word
+        word = reduce(Word.merge, sorted(index.words_by_solution[solution]))
+        puzzle = puzzle.add_word(word, slot.start_pos, slot.dir)
+    return puzzle
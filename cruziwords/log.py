@@ -0,0 +1,34 @@
+import json
+import logging
+from typing import override
+
+TEXT_FORMAT = "%(asctime)s\t%(levelname)s\t%(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format log records as one JSON object per line, for consumption by log processors.
+    """
+
+    @override
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_logging(level: int = logging.DEBUG, structured: bool = False) -> None:
+    """
+    Set up logging for the command line entry points.
+    :param level: Minimum level of log messages to output.
+    :param structured: Output log messages as JSON lines, instead of tab-separated text.
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter() if structured else logging.Formatter(TEXT_FORMAT))
+    logging.basicConfig(level=level, handlers=[handler])
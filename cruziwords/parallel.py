@@ -0,0 +1,216 @@
+import logging
+import multiprocessing
+import queue
+from multiprocessing.sharedctypes import Synchronized
+from multiprocessing.synchronize import Event
+from typing import NamedTuple
+
+from .puzzle import Puzzle
+from .scoring import ScoreFuncType
+from .search import expand_frontier, start_search
+from .words import Word, WordsCorpus
+
+LOGGER = logging.getLogger(__file__)
+
+# How long idle workers wait for a subtree to be shared, before checking whether the search has finished
+POLL_INTERVAL = 0.05
+
+
+class Subtree(NamedTuple):
+    """
+    A subtree of the search, rooted at an intermediate puzzle. The words which should still be placed are the corpus
+    words not on the puzzle yet, so they needn't be sent along.
+    """
+
+    puzzle: Puzzle
+    depth: int
+
+
+class SharedState(NamedTuple):
+    """
+    State shared by the workers of a parallel search.
+    """
+
+    # Subtrees waiting to be explored by whichever worker is idle
+    subtrees: "multiprocessing.Queue[Subtree]"
+    # New best puzzles, with their scores
+    results: "multiprocessing.Queue[tuple[float, Puzzle]]"
+    # Number of subtrees queued or being explored; the search is finished once it drops to zero
+    pending: "Synchronized[int]"
+    # Number of workers waiting for a subtree
+    idle: "Synchronized[int]"
+    # Best score found by any worker so far
+    best_score: "Synchronized[float]"
+    # Number of leaves found by all workers so far
+    iterations: "Synchronized[int]"
+    stop: Event
+
+
+class SubtreeExplorer:
+    """
+    Explores subtrees of a search in a worker process, like `greedy_search` does. Whenever other workers are idle, the
+    siblings of the subtree it descends into next are shared with them.
+    """
+
+    def __init__(
+        self, words: WordsCorpus, score_func: ScoreFuncType, max_iterations: int | None, state: SharedState
+    ) -> None:
+        """
+        :param words: All words of the search, except for the first one.
+        :param score_func: Callable to assign a desirability score to puzzle.
+        :param max_iterations: Stop all workers after this many iterations in total.
+        :param state: State shared with the other workers.
+        """
+        self.words = words
+        self.score_func = score_func
+        self.max_iterations = max_iterations
+        self.state = state
+
+    def share(self, subtree: Subtree) -> None:
+        with self.state.pending.get_lock():
+            self.state.pending.value += 1
+        self.state.subtrees.put(subtree)
+
+    def report(self, puzzle: Puzzle) -> None:
+        """
+        Record a leaf of the search, and publish it if it beats the best score of all workers.
+        """
+        with self.state.iterations.get_lock():
+            self.state.iterations.value += 1
+            iterations = self.state.iterations.value
+        if self.max_iterations is not None and iterations >= self.max_iterations:
+            self.state.stop.set()
+
+        score = self.score_func(puzzle)
+        with self.state.best_score.get_lock():
+            if score <= self.state.best_score.value:
+                return
+            self.state.best_score.value = score
+            self.state.results.put((score, puzzle))
+
+        LOGGER.debug("Best score updated to %.4f after %d iterations", score, iterations)
+
+    def explore(self, words: WordsCorpus, puzzle: Puzzle, depth: int) -> None:
+        if self.state.stop.is_set():
+            return
+
+        frontier = expand_frontier(words, puzzle, self.score_func, depth)
+        if frontier.empty:
+            self.report(puzzle)
+            return
+
+        children = list(frontier)
+        while children:
+            child_puzzle, child_words = children.pop()
+            if children and self.state.idle.value > 0:
+                # Let idle workers steal the remaining siblings, rather than exploring them one after another
+                for sibling_puzzle, _ in children:
+                    self.share(Subtree(sibling_puzzle, depth + 1))
+                children = []
+            self.explore(child_words, child_puzzle, depth + 1)
+
+    def next_subtree(self) -> Subtree | None:
+        """
+        :return: A subtree shared by another worker, or `None` once the search is finished.
+        """
+        with self.state.idle.get_lock():
+            self.state.idle.value += 1
+        try:
+            while not self.state.stop.is_set() and self.state.pending.value > 0:
+                try:
+                    return self.state.subtrees.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    pass
+            return None
+        finally:
+            with self.state.idle.get_lock():
+                self.state.idle.value -= 1
+
+    def run(self) -> None:
+        while (subtree := self.next_subtree()) is not None:
+            try:
+                words = WordsCorpus(self.words.words - subtree.puzzle.placed_words, self.words.letter_index)
+                self.explore(words, subtree.puzzle, subtree.depth)
+            finally:
+                with self.state.pending.get_lock():
+                    self.state.pending.value -= 1
+
+
+def _run_worker(words: list[Word], score_func: ScoreFuncType, max_iterations: int | None, state: SharedState) -> None:
+    # Once this worker exits, any subtrees it shared are no longer needed; don't block until they're read
+    state.subtrees.cancel_join_thread()
+    try:
+        SubtreeExplorer(WordsCorpus(words), score_func, max_iterations, state).run()
+    except KeyboardInterrupt:
+        pass
+
+
+def parallel_search_puzzle(
+    words: WordsCorpus,
+    score_func: ScoreFuncType,
+    max_iterations: int | None = None,
+    workers: int | None = None,
+) -> Puzzle:
+    """
+    Create a nice puzzle like `search_puzzle`, exploring the search tree with several worker processes. Subtrees are
+    handed to idle workers as the search goes, and the best score is shared between them, so that a single search
+    uses all cores.
+
+    The search tree is as narrow as that of `search_puzzle`: three subtrees at the root, two below each of those, and a
+    single path further down. Subtrees are only shared at branches, so at most six workers are ever busy at once.
+    :param words: Words that should be placed.
+    :param score_func: Callable to assign a desirability score to puzzle. Must be picklable.
+    :param max_iterations: Stop finding a more desirable puzzle after this many iterations, counted across workers.
+    :param workers: Number of worker processes; defaults to the number of CPUs. More than six are never busy at once.
+    :return: The best puzzle discovered by this search.
+    """
+    words, start_puzzle = start_search(words)
+    workers = workers or multiprocessing.cpu_count()
+
+    context = multiprocessing.get_context("spawn")
+    state = SharedState(
+        subtrees=context.Queue(),
+        results=context.Queue(),
+        pending=context.Value("i", 1),
+        idle=context.Value("i", 0),
+        best_score=context.Value("d", float("-inf")),
+        iterations=context.Value("i", 0),
+        stop=context.Event(),
+    )
+    state.subtrees.put(Subtree(start_puzzle, 0))
+
+    processes = [
+        context.Process(target=_run_worker, args=(list(words), score_func, max_iterations, state), daemon=True)
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    LOGGER.debug("Started %d search workers", workers)
+
+    best_score, best_puzzle = float("-inf"), start_puzzle
+
+    def collect_results(timeout: float) -> None:
+        nonlocal best_score, best_puzzle
+        try:
+            while True:
+                score, puzzle = state.results.get(timeout=timeout)
+                if score > best_score:
+                    best_score, best_puzzle = score, puzzle
+        except queue.Empty:
+            pass
+
+    try:
+        while any(process.is_alive() for process in processes):
+            collect_results(POLL_INTERVAL)
+            if any(process.exitcode for process in processes):
+                state.stop.set()
+                raise RuntimeError("Search worker failed")
+        collect_results(0)
+    except KeyboardInterrupt:
+        LOGGER.warning("Aborting search")
+        state.stop.set()
+    finally:
+        for process in processes:
+            process.join()
+
+    return best_puzzle
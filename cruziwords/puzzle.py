@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from enum import Enum
 from functools import cached_property
-from typing import Iterator, NamedTuple
+from typing import Iterator, Mapping, NamedTuple
 
 from .words import Word
 
@@ -15,6 +15,13 @@ class Direction(Enum):
     ACROSS = 1
     DOWN = 2
 
+    @property
+    def perpendicular(self) -> Direction:
+        """
+        :return: The direction in which words crossing a word in this direction go.
+        """
+        return Direction.DOWN if self is Direction.ACROSS else Direction.ACROSS
+
 
 class Position(NamedTuple):
     """
@@ -61,6 +68,8 @@ class WordEnd:
 
 type SquareType = WordStart | Letter | WordEnd  # type: ignore[valid-type]
 
+type AnchorsType = dict[str, dict[Position, Direction]]
+
 
 class InvalidOperation(Exception):
     """
@@ -76,12 +85,41 @@ class Puzzle:
     puzzle.
     """
 
-    def __init__(self, positions: dict[Position, SquareType] | None = None):
+    def __init__(
+        self,
+        positions: dict[Position, SquareType] | None = None,
+        anchors: AnchorsType | None = None,
+        placed_words: frozenset[Word] | None = None,
+    ):
         """
         :param positions: Mapping of positions to squares. Not expected to be set by caller; use `add_word` to construct
         puzzles instead.
+        :param anchors: Index of open anchors, see `anchors`. Computed from `positions` if not given.
+        :param placed_words: Words on the puzzle, see `placed_words`. Computed from `positions` if not given.
         """
         self.__positions = positions or {}
+        self.__anchors = anchors if anchors is not None else self.__index_anchors(self.__positions)
+        self.__placed_words = (
+            placed_words
+            if placed_words is not None
+            else frozenset(square.word for square in self.__positions.values() if type(square) is WordStart)
+        )
+
+    @staticmethod
+    def __index_anchors(positions: dict[Position, SquareType]) -> AnchorsType:
+        """
+        Build the index of open anchors from scratch, by walking the letters of each word on the puzzle.
+        """
+        anchors: AnchorsType = {}
+        for start_pos, square in positions.items():
+            if type(square) is not WordStart:
+                continue
+            for i in range(len(square.word)):
+                pos = start_pos.move(i + 1, square.dir)
+                letter_square = positions[pos]
+                if type(letter_square) is Letter and len(letter_square.words) == 1:
+                    anchors.setdefault(letter_square.letter, {})[pos] = square.dir.perpendicular
+        return anchors
 
     def __getitem__(self, col_row: tuple[int, int]) -> SquareType | None:
         """
@@ -98,6 +136,22 @@ class Puzzle:
         """
         return iter(self.__positions.items())
 
+    @property
+    def anchors(self) -> Mapping[str, Mapping[Position, Direction]]:
+        """
+        Index of the squares which another word could still cross: letters which belong to a single word so far. Maps
+        each letter to the positions where it's found, and the direction a crossing word would have to go there.
+        Squares already crossed by two words are never included. Kept up to date by `add_word`.
+        """
+        return self.__anchors
+
+    @property
+    def placed_words(self) -> frozenset[Word]:
+        """
+        :return: The words placed on this puzzle. Kept up to date by `add_word`.
+        """
+        return self.__placed_words
+
     @cached_property
     def dimensions(self) -> tuple[int, int, int, int]:
         """
@@ -177,19 +231,39 @@ class Puzzle:
             case _:
                 raise InvalidOperation()
 
-        # A letter can only be placed on an empty square, or an identical letter
-        for i in range(len(word)):
+        # A letter can only be placed on an empty square, or an identical letter. New letters become anchors for words
+        # going in the perpendicular direction; letters we cross are no longer anchors.
+        new_anchors: list[tuple[str, Position]] = []
+        crossed_anchors: list[tuple[str, Position]] = []
+        for i, word_letter in enumerate(word.solution):
             pos = start_pos.move(i + 1, dir)
             existing_letter = self.__positions.get(pos)
             match existing_letter:
                 case None:
-                    changes[pos] = Letter(word[i], frozenset([word]))
-                case Letter(letter=letter, words=words) if letter == word[i]:
-                    changes[pos] = Letter(word[i], frozenset(words | {word}))
+                    changes[pos] = Letter(word_letter, frozenset([word]))
+                    new_anchors.append((word_letter, pos))
+                case Letter(letter=letter, words=words) if letter == word_letter:
+                    changes[pos] = Letter(word_letter, frozenset(words | {word}))
+                    crossed_anchors.append((letter, pos))
                 case _:
                     raise InvalidOperation()
 
         # If we got this far, the word placement is valid. Make a copy of this board's positions with the changes, and
         # construct a new instance.
         new_positions = self.__positions | changes
-        return Puzzle(new_positions)
+
+        # Copy only the parts of the anchor index which change
+        anchors = self.__anchors.copy()
+        copied_letters = set()
+        for letter, pos in new_anchors + crossed_anchors:
+            if letter not in copied_letters:
+                anchors[letter] = anchors.get(letter, {}).copy()
+                copied_letters.add(letter)
+        for letter, pos in new_anchors:
+            anchors[letter][pos] = dir.perpendicular
+        for letter, pos in crossed_anchors:
+            anchors[letter].pop(pos, None)
+            if not anchors[letter]:
+                del anchors[letter]
+
+        return Puzzle(new_positions, anchors, self.__placed_words | {word})
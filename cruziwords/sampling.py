@@ -0,0 +1,103 @@
+import logging
+import random
+from typing import Iterable
+
+from .puzzle import Puzzle
+from .words import Word, WordsCorpus
+
+LOGGER = logging.getLogger(__file__)
+
+
+class CorpusSampler:
+    """
+    Draws small working sets of words from a large corpus, so that the cost of each search step depends on the size
+    of the puzzle we're after, rather than on the size of the corpus.
+
+    Words are drawn randomly, favoring words with a high weight (see `Word.weight`), and words whose letters are common
+    in the corpus and hence likely to cross other words. When a search stalls because none of the words in its working
+    set can be placed, they are swapped for fresh words, and put back to be drawn again later.
+    """
+
+    # Size of working sets, as a multiple of the target number of words
+    WORKING_SET_FACTOR = 3
+
+    def __init__(self, words: WordsCorpus, target_words: int, max_refills: int = 100):
+        """
+        :param words: The full corpus to draw from.
+        :param target_words: How many words the puzzle should have.
+        :param max_refills: Maximum number of times fresh words are drawn during a search.
+        """
+        self.target_words = target_words
+        self.working_set_size = target_words * self.WORKING_SET_FACTOR
+        self.max_refills = max_refills
+        self.refills = 0
+
+        letter_counts = {letter: len(occurrences) for letter, occurrences in words.letter_index.occurrences.items()}
+
+        def priority(word: Word) -> float:
+            crossing_potential = sum(letter_counts[letter] for letter in word.solution)
+            return word.weight * crossing_potential
+
+        # Weighted random order, with the most likely words drawn first (Efraimidis & Spirakis). Words with zero weight
+        # are never drawn. Keys are assigned in sorted order, so that the order only depends on the random seed.
+        keyed_words = [
+            (random.random() ** (1 / word_priority), word)
+            for word in sorted(words)
+            if (word_priority := priority(word)) > 0
+        ]
+        keyed_words.sort(key=lambda keyed_word: keyed_word[0])
+        self.reserve = [word for _, word in keyed_words]
+
+    def draw(self, n: int, placed_words: frozenset[Word] = frozenset()) -> WordsCorpus:
+        """
+        :param placed_words: Words already on the puzzle; these stay in the reserve, rather than being drawn again.
+        :return: A new `WordsCorpus` of up to `n` words from the reserve.
+        """
+        drawn: list[Word] = []
+        skipped: list[Word] = []
+        while self.reserve and len(drawn) < n:
+            word = self.reserve.pop()
+            (skipped if word in placed_words else drawn).append(word)
+        self.reserve.extend(reversed(skipped))
+        return WordsCorpus(drawn)
+
+    def put_back(self, words: Iterable[Word]) -> None:
+        """
+        Return words which couldn't be placed (yet) to the reserve. They may still cross words drawn later, so they're
+        drawn again once all other words have been. A word may end up in the reserve more than once, as branches of a
+        search put back their words independently; that's harmless, as words on the puzzle are never drawn.
+        """
+        # Sorted, so that the order of the reserve only depends on the random seed
+        self.reserve[:0] = sorted(words)
+
+    def initial(self) -> WordsCorpus:
+        """
+        :return: The working set to start a search with.
+        """
+        return self.draw(self.working_set_size)
+
+    def is_complete(self, puzzle: Puzzle) -> bool:
+        """
+        :return: Whether the puzzle has reached the target number of words.
+        """
+        return len(puzzle.placed_words) >= self.target_words
+
+    def refill(self, puzzle: Puzzle, words: WordsCorpus) -> WordsCorpus | None:
+        """
+        Called when a search stalls, because none of its remaining words can be placed on the puzzle.
+        :param puzzle: Puzzle we're stuck on.
+        :param words: Remaining words of the working set, none of which can be placed. They're put back in the reserve.
+        :return: Fresh words to continue the search with, or `None` if the search should end here.
+        """
+        if self.refills >= self.max_refills:
+            return None
+
+        placed_words = len(puzzle.placed_words)
+        fresh_words = self.draw(max(len(words), self.working_set_size - placed_words), puzzle.placed_words)
+        self.put_back(words)
+        if not fresh_words:
+            return None
+
+        self.refills += 1
+        LOGGER.debug("Search stalled at %d words; swapped in %d fresh words", placed_words, len(fresh_words))
+        return fresh_words
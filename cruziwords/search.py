@@ -1,10 +1,9 @@
 import logging
 import random
-from itertools import groupby
-from operator import itemgetter
-from typing import Iterable
+from typing import Callable, Iterable, Iterator
 
-from .puzzle import Direction, InvalidOperation, Letter, Position, Puzzle
+from .puzzle import Direction, InvalidOperation, Letter, Position, Puzzle, WordStart
+from .sampling import CorpusSampler
 from .scoring import ScoreFuncType
 from .search_frontier import SearchFrontier
 from .words import Word, WordsCorpus
@@ -12,88 +11,284 @@ from .words import Word, WordsCorpus
 LOGGER = logging.getLogger(__file__)
 
 
-def greedy_search(words: WordsCorpus, puzzle: Puzzle, score_func: ScoreFuncType, depth: int = 0) -> Iterable[Puzzle]:
+def expand_frontier(words: WordsCorpus, puzzle: Puzzle, score_func: ScoreFuncType, depth: int) -> SearchFrontier:
     """
-    Try different placements of words on puzzle recursively. At each iteration, keep exploring a small number of the
-    most desirable intermediate puzzles (hence the greedy).
-
+    Try all placements of words crossing an open anchor on puzzle, and keep the most desirable ones.
     :param words: Words that should still be placed.
     :param puzzle: Intermediate state of the puzzle we're exploring.
     :param score_func: Callable to assign a desirability score to puzzle.
-    :param depth: Recursion depth; used to control the breadth of our search.
-    :return: Yields puzzles which are discovered by this search.
+    :param depth: Recursion depth; the deeper, the fewer puzzles are kept.
+    :return: Frontier of puzzles with one more word placed. Empty if no further word can be placed.
     """
     # As we progress deeper, limit the search frontier so that we converge at some point
     frontier = SearchFrontier(score_func, max(3 - depth, 1))
 
-    # Sort and group same letters to speed up the search
-    letters_sorted = sorted(
-        ((pos_cell[0], pos_cell[1].letter) for pos_cell in puzzle if type(pos_cell[1]) is Letter),
-        key=itemgetter(1),
-    )
-    letters_grouped = groupby(letters_sorted, key=itemgetter(1))
-
+    # Words can only be placed crossing an open anchor on the board, in the direction that's still free there
     letter: str
-    for letter, positions_group in letters_grouped:
-        # Convert to list so we can iterate multiple times
-        positions = list(pos for pos, _ in positions_group)
+    for letter, anchors in puzzle.anchors.items():
+        # Convert to list so we can shuffle
+        positions = list(anchors.items())
         random.shuffle(positions)
 
         for possible_word, i in words.containing(letter):
-            for pos in positions:
-                for dir in Direction:
-                    start_pos = pos.move(-i - 1, dir)
-                    try:
-                        new_puzzle = puzzle.add_word(possible_word, start_pos, dir)
-                    except InvalidOperation:
-                        continue
-                    else:
-                        new_words = words.pop(possible_word)
-                        frontier.consider(new_puzzle, new_words)
+            for pos, dir in positions:
+                start_pos = pos.move(-i - 1, dir)
+                try:
+                    new_puzzle = puzzle.add_word(possible_word, start_pos, dir)
+                except InvalidOperation:
+                    continue
+                else:
+                    new_words = words.pop(possible_word)
+                    frontier.consider(new_puzzle, new_words)
+
+    return frontier
+
+
+def greedy_search(
+    words: WordsCorpus,
+    puzzle: Puzzle,
+    score_func: ScoreFuncType,
+    depth: int = 0,
+    sampler: CorpusSampler | None = None,
+    should_stop: Callable[[], bool] | None = None,
+) -> Iterable[Puzzle]:
+    """
+    Try different placements of words on puzzle recursively. At each iteration, keep exploring a small number of the
+    most desirable intermediate puzzles (hence the greedy).
+
+    :param words: Words that should still be placed.
+    :param puzzle: Intermediate state of the puzzle we're exploring.
+    :param score_func: Callable to assign a desirability score to puzzle.
+    :param depth: Recursion depth; used to control the breadth of our search.
+    :param sampler: If set, `words` is a working set drawn from a larger corpus by this sampler. Stop once the target
+    number of words is placed, and ask it for fresh words when no further words can be placed.
+    :param should_stop: If set, checked before expanding each puzzle; the search ends as soon as it returns true.
+    :return: Yields puzzles which are discovered by this search.
+    """
+    if should_stop is not None and should_stop():
+        return
+
+    if sampler is not None and sampler.is_complete(puzzle):
+        yield puzzle
+        return
+
+    frontier = expand_frontier(words, puzzle, score_func, depth)
 
     if not frontier.empty:
         # We've found possible word placements - keep exploring recursively
         for best_puzzle, best_words in frontier:
-            yield from greedy_search(best_words, best_puzzle, score_func, depth + 1)
+            yield from greedy_search(best_words, best_puzzle, score_func, depth + 1, sampler, should_stop)
+    elif sampler is not None and (fresh_words := sampler.refill(puzzle, words)) is not None:
+        # We're stuck with these words, but may continue with fresh ones
+        yield from greedy_search(fresh_words, puzzle, score_func, depth + 1, sampler, should_stop)
     else:
         # No further words could be placed - we've reached the base case
         yield puzzle
 
 
-def search_puzzle(words: WordsCorpus, score_func: ScoreFuncType, max_iterations: int | None = None) -> Puzzle:
+def start_search(words: WordsCorpus) -> tuple[WordsCorpus, Puzzle]:
     """
-    Create a nice puzzle which contains as many words from words corpus as can be placed.
+    Place the first word of a search: the longest one.
     :param words: Words that should be placed.
-    :param score_func: Callable to assign a desirability score to puzzle.
-    :param max_iterations: Stop finding a more desirable puzzle after this many iterations.
-    :return: The best puzzle discovered by this search.
+    :return: Tuple of (words that should still be placed, puzzle holding the first word).
     """
-    # Place the longest word first.
-    first_word = max(words, key=Word.__len__)
+    # Drop words which can't cross any other word; they would never be placed anyway
+    placeable_words = words.placeable()
+    if len(placeable_words) < len(words):
+        LOGGER.debug("Dropping %d words which don't cross any other word", len(words) - len(placeable_words))
+    if placeable_words:
+        words = placeable_words
+
+    # Place the longest word first. Break ties by the word itself, rather than by the order of the set.
+    first_word = max(words, key=lambda word: (len(word), word))
     words = words.pop(first_word)
     start_puzzle = Puzzle().add_word(first_word, Position(0, 0), Direction.DOWN)
+    return words, start_puzzle
+
 
+def iter_improvements(
+    words: WordsCorpus,
+    puzzle: Puzzle,
+    score_func: ScoreFuncType,
+    max_iterations: int | None = None,
+    sampler: CorpusSampler | None = None,
+    should_stop: Callable[[], bool] | None = None,
+) -> Iterator[Puzzle]:
+    """
+    Run `greedy_search` from a puzzle, and yield each puzzle it discovers that scores better than the ones before.
+    :param words: Words that should still be placed.
+    :param puzzle: Puzzle to start from.
+    :param score_func: Callable to assign a desirability score to puzzle.
+    :param max_iterations: Stop finding a more desirable puzzle after this many iterations.
+    :param sampler: Sampler which `words` were drawn from, if any; see `greedy_search`.
+    :param should_stop: If set, checked before expanding each puzzle; the search ends as soon as it returns true.
+    :return: Yields puzzles of increasing score.
+    """
     iterations = 0
-    best_puzzle = start_puzzle
     best_score = None
 
+    for next_puzzle in greedy_search(words, puzzle, score_func, sampler=sampler, should_stop=should_stop):
+        next_score = score_func(next_puzzle)
+        if best_score is None or next_score > best_score:
+            best_score = next_score
+            yield next_puzzle
+
+            LOGGER.debug(
+                "Best score updated to %.4f after %d iterations",
+                next_score,
+                iterations,
+            )
+
+        iterations += 1
+        if max_iterations is not None and iterations >= max_iterations:
+            break
+
+
+def iter_best_puzzles(
+    words: WordsCorpus,
+    score_func: ScoreFuncType,
+    max_iterations: int | None = None,
+    target_words: int | None = None,
+    should_stop: Callable[[], bool] | None = None,
+) -> Iterator[Puzzle]:
+    """
+    Search for a nice puzzle like `search_puzzle`, yielding each new best puzzle as soon as it's discovered. The first
+    puzzle yielded only holds the longest word.
+    :param words: Words that should be placed.
+    :param score_func: Callable to assign a desirability score to puzzle.
+    :param max_iterations: Stop finding a more desirable puzzle after this many iterations.
+    :param target_words: If set, and the corpus is much larger than that, only search small working sets of words
+    sampled from the corpus, aiming for a puzzle with this many words. See `CorpusSampler`.
+    :param should_stop: If set, checked before expanding each puzzle; the search ends as soon as it returns true.
+    :return: Yields puzzles of increasing score.
+    """
+    sampler = None
+    if target_words is not None and len(words) > target_words * CorpusSampler.WORKING_SET_FACTOR:
+        sampler = CorpusSampler(words, target_words)
+        LOGGER.debug("Sampling working sets of %d words from %d words", sampler.working_set_size, len(words))
+        words = sampler.initial()
+
+    initial_words = words
+    words, start_puzzle = start_search(words)
+    if sampler is not None:
+        # Words which don't cross any other word of the working set may still cross words drawn later
+        sampler.put_back(initial_words.words - words.words - start_puzzle.placed_words)
+    yield start_puzzle
+
+    yield from iter_improvements(words, start_puzzle, score_func, max_iterations, sampler, should_stop)
+
+
+def search_puzzle(
+    words: WordsCorpus,
+    score_func: ScoreFuncType,
+    max_iterations: int | None = None,
+    target_words: int | None = None,
+) -> Puzzle:
+    """
+    Create a nice puzzle which contains as many words from words corpus as can be placed.
+    :param words: Words that should be placed.
+    :param score_func: Callable to assign a desirability score to puzzle.
+    :param max_iterations: Stop finding a more desirable puzzle after this many iterations.
+    :param target_words: If set, and the corpus is much larger than that, only search small working sets of words
+    sampled from the corpus, aiming for a puzzle with this many words. See `CorpusSampler`.
+    :return: The best puzzle discovered by this search.
+    """
+    best_puzzle = None
+
     try:
-        for next_puzzle in greedy_search(words, start_puzzle, score_func):
-            next_score = score_func(next_puzzle)
-            if best_score is None or next_score > best_score:
-                best_score = next_score
-                best_puzzle = next_puzzle
-
-                LOGGER.debug(
-                    "Best score updated to %.4f after %d iterations",
-                    next_score,
-                    iterations,
-                )
-
-            iterations += 1
-            if max_iterations is not None and iterations >= max_iterations:
-                break
+        for best_puzzle in iter_best_puzzles(words, score_func, max_iterations, target_words):
+            pass
     except KeyboardInterrupt:
+        if best_puzzle is None:
+            # Not even the first word was placed yet
+            raise
         LOGGER.warning("Aborting search")
 
+    assert best_puzzle is not None
+    return best_puzzle
+
+
+def largest_component(puzzle: Puzzle) -> Puzzle:
+    """
+    :return: A puzzle holding only the largest group of words on puzzle which are connected by crossing each other,
+    each word where it was.
+    """
+    crossing_words: dict[Word, set[Word]] = {word: set() for word in puzzle.placed_words}
+    for _, square in puzzle:
+        if type(square) is Letter and len(square.words) == 2:
+            word, other_word = square.words
+            crossing_words[word].add(other_word)
+            crossing_words[other_word].add(word)
+
+    components = []
+    unvisited = set(crossing_words)
+    while unvisited:
+        component = {unvisited.pop()}
+        stack = list(component)
+        while stack:
+            for other_word in crossing_words[stack.pop()] & unvisited:
+                unvisited.remove(other_word)
+                component.add(other_word)
+                stack.append(other_word)
+        components.append(component)
+
+    # Break ties by solutions, so that the same part is kept every time
+    largest = max(components, key=lambda component: (len(component), sorted(word.solution for word in component)))
+    if len(largest) == len(crossing_words):
+        return puzzle
+
+    LOGGER.debug(
+        "Puzzle fell apart into %d parts; keeping %d of %d words", len(components), len(largest), len(crossing_words)
+    )
+    component_puzzle = Puzzle()
+    for start_pos, square in puzzle:
+        if type(square) is WordStart and square.word in largest:
+            component_puzzle = component_puzzle.add_word(square.word, start_pos, square.dir)
+    return component_puzzle
+
+
+def regenerate_puzzle(
+    puzzle: Puzzle,
+    words: WordsCorpus,
+    score_func: ScoreFuncType,
+    max_iterations: int | None = None,
+) -> Puzzle:
+    """
+    Update a previously generated puzzle after its corpus was edited, rather than searching from scratch. Placed words
+    which are no longer in the corpus are removed, the rest of the layout is kept as is, and the search continues from
+    there with the words that aren't on the puzzle yet.
+    :param puzzle: Previously generated puzzle.
+    :param words: Edited corpus. Placed words are matched to its words by solution, so their clues are updated, too.
+    :param score_func: Callable to assign a desirability score to puzzle.
+    :param max_iterations: Stop finding a more desirable puzzle after this many iterations.
+    :return: The best puzzle discovered by this search.
+    """
+    words_by_solution = {word.solution: word for word in words}
+
+    kept_puzzle = Puzzle()
+    for start_pos, square in puzzle:
+        if type(square) is not WordStart:
+            continue
+        word = words_by_solution.get(square.word.solution)
+        if word is None:
+            LOGGER.debug("Removing %s, which is no longer in the corpus", square.word.solution)
+            continue
+        kept_puzzle = kept_puzzle.add_word(word, start_pos, square.dir)
+
+    if not kept_puzzle.placed_words:
+        LOGGER.debug("None of the placed words are left; searching from scratch")
+        return search_puzzle(words, score_func, max_iterations)
+
+    # Removed words may have held parts of the puzzle together; only keep the largest part, and try to place the words
+    # of the other parts again
+    kept_puzzle = largest_component(kept_puzzle)
+
+    # Drop words which can't cross any other word; they would never be placed anyway
+    placeable_words = words.placeable()
+    remaining_words = WordsCorpus(placeable_words.words - kept_puzzle.placed_words, placeable_words.letter_index)
+    LOGGER.debug("Kept %d words; trying to place %d more", len(kept_puzzle.placed_words), len(remaining_words))
+
+    best_puzzle = kept_puzzle
+    for best_puzzle in iter_improvements(remaining_words, kept_puzzle, score_func, max_iterations):
+        pass
     return best_puzzle
@@ -0,0 +1,79 @@
+import json
+from typing import Any
+
+from ..puzzle import Direction, InvalidOperation, Letter, Position, Puzzle, WordStart
+from ..words import Word
+
+# Characters used in the compact grid encoding
+CLUE_SQUARE = "#"
+EMPTY_SQUARE = "."
+
+
+def encode_puzzle(puzzle: Puzzle) -> dict[str, Any]:
+    """
+    Encode a puzzle compactly, so that clients can render it themselves. The grid is a list of rows, with one character
+    per square: the solution letter, `#` for squares holding a clue, or `.` for empty squares. Clues are listed
+    separately, with their position relative to the top left corner of the grid.
+    :param puzzle: Puzzle to encode.
+    :return: JSON-serializable dict with keys "width", "height", "grid" and "clues".
+    """
+    grid = []
+    clues = []
+
+    for row in range(puzzle.top, puzzle.bottom + 1):
+        grid_row = []
+        for col in range(puzzle.left, puzzle.right + 1):
+            match puzzle[col, row]:
+                case WordStart(word=word, dir=dir):
+                    grid_row.append(CLUE_SQUARE)
+                    clues.append(
+                        {
+                            "col": col - puzzle.left,
+                            "row": row - puzzle.top,
+                            "dir": "across" if dir == Direction.ACROSS else "down",
+                            "length": len(word),
+                            "clue": word.pick_clue(),
+                        }
+                    )
+                case Letter(letter=letter):
+                    grid_row.append(letter)
+                case _:
+                    grid_row.append(EMPTY_SQUARE)
+        grid.append("".join(grid_row))
+
+    return {"width": puzzle.width, "height": puzzle.height, "grid": grid, "clues": clues}
+
+
+def render_puzzle_json(puzzle: Puzzle) -> str:
+    """
+    :return: Compact JSON encoding of the puzzle, see `encode_puzzle`.
+    """
+    return json.dumps(encode_puzzle(puzzle), ensure_ascii=False, separators=(",", ":"))
+
+
+def decode_puzzle(encoded: dict[str, Any]) -> Puzzle:
+    """
+    Rebuild a puzzle from its encoding by `encode_puzzle`. Solutions are read off the grid, and each word gets the
+    clue it was encoded with. Raises `ValueError` if the encoding is malformed.
+    :param encoded: Dict as returned by `encode_puzzle`.
+    :return: Puzzle with its top left corner at (0, 0).
+    """
+    puzzle = Puzzle()
+    try:
+        grid = encoded["grid"]
+        for clue in encoded["clues"]:
+            dir = Direction.ACROSS if clue["dir"] == "across" else Direction.DOWN
+            start_pos = Position(clue["col"], clue["row"])
+            letter_positions = [start_pos.move(i + 1, dir) for i in range(clue["length"])]
+            solution = "".join(grid[pos.row][pos.col] for pos in letter_positions)
+            puzzle = puzzle.add_word(Word(clue["clue"], solution), start_pos, dir)
+    except (KeyError, IndexError, TypeError, InvalidOperation) as e:
+        raise ValueError("Malformed puzzle encoding") from e
+    return puzzle
+
+
+def load_puzzle_json(puzzle_json: str) -> Puzzle:
+    """
+    :return: Puzzle rebuilt from its JSON encoding, see `render_puzzle_json`.
+    """
+    return decode_puzzle(json.loads(puzzle_json))
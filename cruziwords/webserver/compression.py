@@ -0,0 +1,55 @@
+import gzip
+import zlib
+
+# Supported content codings, in order of preference
+ENCODINGS = ("gzip", "deflate")
+
+# Responses smaller than this aren't worth compressing
+MIN_COMPRESS_SIZE = 256
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """
+    Pick a content coding for the response, based on the request's `Accept-Encoding` header.
+    :param accept_encoding: Value of the `Accept-Encoding` header, if any.
+    :return: "gzip", "deflate", or `None` if the response should be sent uncompressed.
+    """
+    if not accept_encoding:
+        return None
+
+    qualities: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+
+    wildcard = qualities.get("*", 0.0)
+    candidates = [(qualities.get(encoding, wildcard), encoding) for encoding in ENCODINGS]
+    accepted = [candidate for candidate in candidates if candidate[0] > 0]
+    if not accepted:
+        return None
+
+    # Prefer higher quality, then our own order of preference
+    return max(accepted, key=lambda candidate: (candidate[0], -ENCODINGS.index(candidate[1])))[1]
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """
+    :param body: Uncompressed response body.
+    :param encoding: Content coding as returned by `negotiate_encoding`.
+    :return: Compressed response body.
+    """
+    match encoding:
+        case "gzip":
+            return gzip.compress(body, mtime=0)
+        case "deflate":
+            return zlib.compress(body)
+
+    raise ValueError(f"Unsupported content coding {encoding!r}")
@@ -0,0 +1,345 @@
+import argparse
+import http.client
+import logging
+import math
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, NamedTuple
+from urllib.parse import urlsplit
+
+from cruziwords.examples import find_examples
+from cruziwords.log import configure_logging
+
+LOGGER = logging.getLogger(__file__)
+
+
+class LoadRequest(NamedTuple):
+    """
+    A request to replay against the webserver.
+    """
+
+    method: str
+    path: str
+    body: bytes | None = None
+    content_type: str | None = None
+
+
+class RequestResult(NamedTuple):
+    """
+    Outcome of a single request. `status` is `None` if the request failed without a response.
+    """
+
+    method: str
+    status: int | None
+    latency: float
+
+
+class LoadReport(NamedTuple):
+    """
+    Summary of a load test run.
+    """
+
+    requests: int
+    errors: int
+    duration: float
+    p50: float
+    p95: float
+    p99: float
+    max_rss: int | None
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.duration if self.duration else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    def format(self) -> str:
+        lines = [
+            f"Requests:   {self.requests} in {self.duration:.2f}s ({self.throughput:.1f} req/s)",
+            f"Errors:     {self.errors} ({self.error_rate:.1%})",
+            f"Latency:    p50 {self.p50 * 1000:.1f}ms, p95 {self.p95 * 1000:.1f}ms, p99 {self.p99 * 1000:.1f}ms",
+        ]
+        if self.max_rss is not None:
+            lines.append(f"Server RSS: {self.max_rss / 1024 / 1024:.1f} MiB (max)")
+        return "\n".join(lines)
+
+
+def encode_multipart(field_name: str, filename: str, content: bytes) -> tuple[bytes, str]:
+    """
+    Encode a file upload like a browser submitting the form in `index.html` would.
+    :return: Tuple of (request body, content type).
+    """
+    boundary = f"----cruziwords{uuid.uuid4().hex}"
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
+        "Content-Type: text/csv\r\n"
+        "\r\n".encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    )
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def request_mix(corpora: list[Path], post_ratio: float, post_path: str = "/cruziwords") -> Iterator[LoadRequest]:
+    """
+    Endlessly yield a random mix of `GET /` and uploads of one of the corpora.
+    :param corpora: CSV files to upload.
+    :param post_ratio: Fraction of requests which are uploads.
+    :param post_path: Path to post uploads to.
+    """
+    uploads = []
+    for csv_path in corpora:
+        body, content_type = encode_multipart("file", csv_path.name, csv_path.read_bytes())
+        uploads.append(LoadRequest("POST", post_path, body, content_type))
+
+    while True:
+        if uploads and random.random() < post_ratio:
+            yield random.choice(uploads)
+        else:
+            yield LoadRequest("GET", "/")
+
+
+def send_request(
+    host: str, port: int, request: LoadRequest, timeout: float, scheduled_start: float | None = None
+) -> RequestResult:
+    """
+    :param scheduled_start: If given, measure latency from this `time.perf_counter()` value rather than from when the
+    request is actually sent, so that time spent waiting for a free connection is included.
+    """
+    headers = {"accept-encoding": "gzip"}
+    if request.content_type:
+        headers["content-type"] = request.content_type
+
+    start = time.perf_counter() if scheduled_start is None else scheduled_start
+    status = None
+    try:
+        connection = http.client.HTTPConnection(host, port, timeout=timeout)
+        try:
+            connection.request(request.method, request.path, body=request.body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+        finally:
+            connection.close()
+    except (OSError, http.client.HTTPException) as e:
+        LOGGER.debug("%s %s failed: %s", request.method, request.path, e)
+    return RequestResult(request.method, status, time.perf_counter() - start)
+
+
+def read_rss(pid: int) -> int | None:
+    """
+    :return: Resident set size of a process in bytes, or `None` if it can't be determined. Only supported on Linux.
+    """
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """
+    :return: The given percentile of the values, by the nearest-rank method.
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(max(math.ceil(fraction * len(sorted_values)) - 1, 0), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def summarize(results: list[RequestResult], duration: float, max_rss: int | None) -> LoadReport:
+    latencies = sorted(result.latency for result in results)
+    errors = sum(1 for result in results if result.status is None or result.status >= 400)
+    return LoadReport(
+        requests=len(results),
+        errors=errors,
+        duration=duration,
+        p50=percentile(latencies, 0.50),
+        p95=percentile(latencies, 0.95),
+        p99=percentile(latencies, 0.99),
+        max_rss=max_rss,
+    )
+
+
+def run_load(
+    url: str,
+    requests: Iterator[LoadRequest],
+    concurrency: int,
+    duration: float | None = None,
+    total_requests: int | None = None,
+    rate: float | None = None,
+    server_pid: int | None = None,
+    timeout: float = 60.0,
+) -> LoadReport:
+    """
+    Replay requests against a webserver, and measure how it copes.
+    :param url: Base URL of the server, e.g. "http://localhost:8000".
+    :param requests: Requests to replay, see `request_mix`.
+    :param concurrency: Number of requests in flight at once.
+    :param duration: Stop after this many seconds.
+    :param total_requests: Stop after this many requests.
+    :param rate: If given, start requests at this rate per second (open loop) instead of as fast as `concurrency`
+    allows.
+    :param server_pid: If given, sample the resident set size of this process.
+    :param timeout: Socket timeout for each request.
+    :return: Report on throughput, latency, errors and server memory.
+    """
+    if duration is None and total_requests is None:
+        raise ValueError("Either duration or total_requests must be given")
+
+    parsed_url = urlsplit(url)
+    host = parsed_url.hostname or "localhost"
+    port = parsed_url.port or 80
+
+    results: list[RequestResult] = []
+    lock = threading.Lock()
+    start = time.perf_counter()
+    deadline = start + duration if duration is not None else None
+    issued = 0
+
+    def next_request() -> LoadRequest | None:
+        # Hand out requests until the duration or request budget is exhausted
+        nonlocal issued
+        with lock:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return None
+            if total_requests is not None and issued >= total_requests:
+                return None
+            issued += 1
+            return next(requests)
+
+    def record(request: LoadRequest, scheduled_start: float | None = None) -> None:
+        result = send_request(host, port, request, timeout, scheduled_start)
+        with lock:
+            results.append(result)
+
+    max_rss: int | None = None
+    stop_sampling = threading.Event()
+
+    def sample_rss() -> None:
+        nonlocal max_rss
+        assert server_pid is not None
+        while not stop_sampling.is_set():
+            rss = read_rss(server_pid)
+            if rss is not None and (max_rss is None or rss > max_rss):
+                max_rss = rss
+            stop_sampling.wait(0.1)
+
+    sampler = threading.Thread(target=sample_rss, daemon=True) if server_pid is not None else None
+    if sampler:
+        sampler.start()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        if rate:
+            # Open loop: start requests on a fixed schedule, regardless of how quickly the server responds. Latency is
+            # measured from the scheduled start, so that requests queueing behind slow ones aren't left out.
+            interval = 1 / rate
+            next_start = start
+            while (request := next_request()) is not None:
+                executor.submit(record, request, next_start)
+                next_start += interval
+                time.sleep(max(next_start - time.perf_counter(), 0))
+        else:
+            # Closed loop: each worker sends its next request as soon as the previous one completes
+            def worker() -> None:
+                while (request := next_request()) is not None:
+                    record(request)
+
+            for _ in range(concurrency):
+                executor.submit(worker)
+
+    stop_sampling.set()
+    if sampler:
+        sampler.join()
+
+    return summarize(results, time.perf_counter() - start, max_rss)
+
+
+def wait_for_server(host: str, port: int, timeout: float = 10.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while True:
+        connection = http.client.HTTPConnection(host, port, timeout=1)
+        try:
+            connection.request("GET", "/")
+            connection.getresponse().read()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            time.sleep(0.1)
+        finally:
+            connection.close()
+
+
+def parse_args() -> argparse.Namespace:
+    argp = argparse.ArgumentParser("Cruziwords webserver load test!")
+    argp.add_argument("url", nargs="?", default="http://localhost:8000", help="Base URL of the server to test")
+    argp.add_argument(
+        "--corpus",
+        dest="corpora",
+        action="append",
+        type=Path,
+        help="CSV file to upload; may be given multiple times (default: bundled examples)",
+    )
+    argp.add_argument("--post-ratio", type=float, default=0.2, help="Fraction of requests which are uploads")
+    argp.add_argument("--json", action="store_true", help="Upload to the JSON endpoint instead of the HTML one")
+    argp.add_argument("--concurrency", type=int, default=4, help="Number of requests in flight at once")
+    argp.add_argument("--rate", type=float, help="Target request rate per second (default: as fast as possible)")
+    argp.add_argument("--duration", type=float, default=10.0, help="Duration of the test in seconds")
+    argp.add_argument("--requests", type=int, help="Stop after this many requests instead")
+    argp.add_argument("--server-pid", type=int, help="Sample the memory usage of this server process")
+    argp.add_argument(
+        "--spawn-server", action="store_true", help="Start a local cruziwords_webserver on the URL's port and test it"
+    )
+    return argp.parse_args()
+
+
+def main() -> None:
+    configure_logging(logging.INFO)
+    args = parse_args()
+
+    corpora = args.corpora or find_examples()
+    requests = request_mix(corpora, args.post_ratio, "/cruziwords.json" if args.json else "/cruziwords")
+
+    server = None
+    server_pid = args.server_pid
+    if args.spawn_server:
+        parsed_url = urlsplit(args.url)
+        port = parsed_url.port or 80
+        server = subprocess.Popen(
+            [sys.executable, "-m", "cruziwords.webserver.webserver", str(port)], stderr=subprocess.DEVNULL
+        )
+        server_pid = server.pid
+        wait_for_server(parsed_url.hostname or "localhost", port)
+
+    try:
+        LOGGER.info("Load testing %s with concurrency %d", args.url, args.concurrency)
+        report = run_load(
+            args.url,
+            requests,
+            concurrency=args.concurrency,
+            duration=None if args.requests else args.duration,
+            total_requests=args.requests,
+            rate=args.rate,
+            server_pid=server_pid,
+        )
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    print(report.format())
+
+
+if __name__ == "__main__":
+    main()
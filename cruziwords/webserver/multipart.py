@@ -0,0 +1,136 @@
+import codecs
+from email import message_from_bytes
+from io import BufferedIOBase
+from typing import Iterator
+
+
+class MultipartError(ValueError):
+    """
+    Raised when a request body is not a well-formed `multipart/form-data` upload.
+    """
+
+
+class UploadTooLarge(MultipartError):
+    """
+    Raised when a request body exceeds the maximum upload size.
+    """
+
+
+class MultipartReader:
+    """
+    Incremental parser for `multipart/form-data` request bodies. Rather than buffering the whole body, lines are read
+    from the underlying stream on demand, so the contents of a file field can be processed while they are still
+    arriving.
+    """
+
+    def __init__(self, stream: BufferedIOBase, boundary: str, content_length: int, max_size: int):
+        """
+        :param stream: Stream to read the request body from, e.g. `BaseHTTPRequestHandler.rfile`.
+        :param boundary: Boundary parameter from the request's `Content-Type` header.
+        :param content_length: Length of the request body in bytes. Never read beyond it, as the stream may be kept
+        alive for further requests.
+        :param max_size: Maximum accepted body size in bytes. Larger uploads are rejected before reading anything.
+        """
+        if content_length > max_size:
+            raise UploadTooLarge(f"Upload of {content_length} bytes exceeds maximum of {max_size} bytes")
+        if not boundary:
+            raise MultipartError("Missing multipart boundary")
+
+        self.stream = stream
+        self.remaining = content_length
+        self.delimiter = b"--" + boundary.encode("latin-1")
+        self.close_delimiter = self.delimiter + b"--"
+        self.finished = False
+
+    def _readline(self) -> bytes:
+        """
+        :return: Next line of the body including its line terminator, or `b""` once the body is exhausted.
+        """
+        if self.remaining <= 0:
+            return b""
+        line = self.stream.readline(self.remaining)
+        if not line:
+            raise MultipartError("Request body ended prematurely")
+        self.remaining -= len(line)
+        return line
+
+    def _is_delimiter(self, line: bytes) -> bool:
+        """
+        :return: Whether this line separates two parts of the body, and mark the body as finished if it's the last one.
+        """
+        stripped = line.rstrip(b"\r\n")
+        if stripped == self.close_delimiter:
+            self.finished = True
+            return True
+        return stripped == self.delimiter
+
+    def _skip_preamble(self) -> None:
+        while not self.finished:
+            line = self._readline()
+            if not line:
+                raise MultipartError("Multipart boundary not found")
+            if self._is_delimiter(line):
+                return
+
+    def _read_part_name(self) -> str | None:
+        """
+        Read the headers of the current part.
+        :return: Field name taken from the part's `Content-Disposition` header.
+        """
+        header_lines = []
+        while True:
+            line = self._readline()
+            if not line:
+                raise MultipartError("Unterminated part headers")
+            if line in (b"\r\n", b"\n"):
+                break
+            header_lines.append(line)
+
+        headers = message_from_bytes(b"".join(header_lines))
+        name = headers.get_param("name", header="content-disposition")
+        return name if isinstance(name, str) else None
+
+    def _iter_part_body(self) -> Iterator[bytes]:
+        """
+        Yield the lines of the current part's body. The line break preceding a delimiter belongs to the delimiter, so
+        each line is held back until we know whether the next one is a delimiter.
+        """
+        pending: bytes | None = None
+        while True:
+            line = self._readline()
+            if not line:
+                raise MultipartError("Unterminated part body")
+            if self._is_delimiter(line):
+                if pending is not None:
+                    yield pending.removesuffix(b"\n").removesuffix(b"\r")
+                return
+            if pending is not None:
+                yield pending
+            pending = line
+
+    def iter_field_lines(self, field_name: str, encoding: str = "utf-8") -> Iterator[str]:
+        """
+        Yield decoded lines of the field called `field_name`, as they are read from the stream. Other fields are
+        skipped without being stored.
+        :param field_name: Name of the form field, e.g. "file".
+        :param encoding: Encoding of the field's contents.
+        """
+        self._skip_preamble()
+        while not self.finished:
+            name = self._read_part_name()
+            if name != field_name:
+                for _ in self._iter_part_body():
+                    pass
+                continue
+
+            decoder = codecs.getincrementaldecoder(encoding)()
+            try:
+                for line in self._iter_part_body():
+                    yield decoder.decode(line)
+                if tail := decoder.decode(b"", final=True):
+                    yield tail
+            except UnicodeDecodeError as e:
+                raise MultipartError(f"Field {field_name!r} is not valid {encoding}") from e
+            return
+
+        raise MultipartError(f"Field {field_name!r} not found")
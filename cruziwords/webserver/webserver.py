@@ -1,61 +1,217 @@
 import argparse
-import cgi
+import csv
+import hashlib
 import logging
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from functools import cache
+from http import HTTPStatus
 from http.server import HTTPServer, BaseHTTPRequestHandler
+from typing import NamedTuple
 
+from cruziwords.log import configure_logging
+from cruziwords.puzzle import Puzzle
 from cruziwords.scoring import score_puzzle
 from cruziwords.search import search_puzzle
 from cruziwords.view.html import render_puzzle
+from cruziwords.view.json import render_puzzle_json
+from cruziwords.webserver.compression import MIN_COMPRESS_SIZE, compress, negotiate_encoding
+from cruziwords.webserver.multipart import MultipartError, MultipartReader, UploadTooLarge
 from cruziwords.words import WordsCorpus
 
 LOGGER = logging.getLogger(__file__)
 
+DEFAULT_MAX_UPLOAD_SIZE = 1024 * 1024
+
+INDEX_PATH = "cruziwords/webserver/index.html"
+
+
+class StaticFile(NamedTuple):
+    """
+    A static file served by the webserver, along with its cache validators.
+    """
+
+    content: bytes
+    etag: str
+    mtime: float
+
+    @property
+    def last_modified(self) -> str:
+        return formatdate(self.mtime, usegmt=True)
+
+
+@cache
+def load_static_file(path: str) -> StaticFile:
+    """
+    Read a static file once, and keep it in memory for subsequent requests.
+    """
+    with open(path, "rb") as f:
+        content = f.read()
+    etag = f'W/"{hashlib.sha1(content).hexdigest()}"'
+    mtime = int(os.path.getmtime(path))
+    return StaticFile(content, etag, mtime)
+
+
+@cache
+def compress_static_file(path: str, encoding: str) -> bytes:
+    """
+    Compress a static file once per content coding.
+    """
+    return compress(load_static_file(path).content, encoding)
+
 
 class CruziwordsHandler(BaseHTTPRequestHandler):
-    def do_GET(self) -> None:
-        self.send_response(200)
-        self.send_header("content-type", "text/html")
+    # Maximum accepted size of an uploaded request body, in bytes
+    max_upload_size = DEFAULT_MAX_UPLOAD_SIZE
+
+    def send_body(
+        self,
+        body: bytes,
+        content_type: str,
+        headers: dict[str, str] | None = None,
+        compressed: dict[str, bytes] | None = None,
+    ) -> None:
+        """
+        Send a 200 response, compressing the body if the client accepts it.
+        :param body: Uncompressed response body.
+        :param content_type: Value of the `Content-Type` header.
+        :param headers: Additional response headers.
+        :param compressed: Optionally, precompressed variants of the body by content coding.
+        """
+        encoding = negotiate_encoding(self.headers.get("accept-encoding"))
+        if encoding and len(body) >= MIN_COMPRESS_SIZE:
+            body = compressed[encoding] if compressed and encoding in compressed else compress(body, encoding)
+        else:
+            encoding = None
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("content-type", content_type)
+        self.send_header("vary", "accept-encoding")
+        if encoding:
+            self.send_header("content-encoding", encoding)
+        for keyword, value in (headers or {}).items():
+            self.send_header(keyword, value)
+        self.send_header("content-length", str(len(body)))
         self.end_headers()
-        with open("cruziwords/webserver/index.html", "r", encoding="utf-8") as f:
-            output = f.read()
-        self.wfile.write(output.encode())
+        self.wfile.write(body)
+
+    def is_not_modified(self, static_file: StaticFile) -> bool:
+        """
+        :return: Whether the client's cached copy of a static file is still valid, according to its conditional
+        request headers.
+        """
+        if if_none_match := self.headers.get("if-none-match"):
+            # Weak comparison, as per RFC 9110
+            client_etags = {etag.strip().removeprefix("W/") for etag in if_none_match.split(",")}
+            return "*" in client_etags or static_file.etag.removeprefix("W/") in client_etags
+
+        if if_modified_since := self.headers.get("if-modified-since"):
+            try:
+                return static_file.mtime <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+
+        return False
+
+    def send_static_file(self, path: str, content_type: str) -> None:
+        """
+        Send a static file, with validators so that clients can cache it. Responds with 304 if the client's cached
+        copy is still valid.
+        """
+        static_file = load_static_file(path)
+        headers = {
+            "etag": static_file.etag,
+            "last-modified": static_file.last_modified,
+            "cache-control": "no-cache",
+        }
+
+        if self.is_not_modified(static_file):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            for keyword, value in headers.items():
+                self.send_header(keyword, value)
+            self.end_headers()
+            return
 
-    def parse_csv_from_post_request(self) -> str:
-        ctype_header = str(self.headers.get("content-type"))
-        ctype, pdict = cgi.parse_header(ctype_header)
-        if ctype != "multipart/form-data":
-            raise ValueError("Unexpected Content-Type")
+        encoding = negotiate_encoding(self.headers.get("accept-encoding"))
+        compressed = {encoding: compress_static_file(path, encoding)} if encoding else None
+        self.send_body(static_file.content, content_type, headers, compressed)
 
-        pdict_bytes = {key: bytes(value, "utf-8") for key, value in pdict.items()}
-        multipart_data = cgi.parse_multipart(self.rfile, pdict_bytes)
-        form_file: bytes = multipart_data.get("file")[0]  # type: ignore
-        return form_file.decode("utf-8")
+    def do_GET(self) -> None:
+        self.send_static_file(INDEX_PATH, "text/html; charset=utf-8")
+
+    def parse_words_from_post_request(self) -> WordsCorpus:
+        """
+        Construct a words corpus from the CSV file uploaded in this request. Rows are read from the request body as
+        they arrive, instead of buffering the upload first.
+        """
+        if self.headers.get_content_type() != "multipart/form-data":
+            raise MultipartError("Unexpected Content-Type")
+
+        try:
+            content_length = int(self.headers.get("content-length", ""))
+        except ValueError as e:
+            raise MultipartError("Missing or invalid Content-Length") from e
+
+        reader = MultipartReader(
+            self.rfile,
+            boundary=str(self.headers.get_param("boundary", "")),
+            content_length=content_length,
+            max_size=self.max_upload_size,
+        )
+        return WordsCorpus.from_csv_lines(reader.iter_field_lines("file"))
+
+    def generate_puzzle(self) -> Puzzle | None:
+        """
+        Generate a puzzle from the CSV file uploaded in this request, or send an error response and return `None` if
+        the upload is invalid.
+        """
+        try:
+            words = self.parse_words_from_post_request()
+        except UploadTooLarge as e:
+            self.send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, str(e))
+            return None
+        except MultipartError as e:
+            self.send_error(HTTPStatus.BAD_REQUEST, str(e))
+            return None
+        except csv.Error as e:
+            self.send_error(HTTPStatus.BAD_REQUEST, f"Invalid CSV file: {e}")
+            return None
+
+        if not words:
+            self.send_error(HTTPStatus.BAD_REQUEST, "No words found in CSV file")
+            return None
+
+        return search_puzzle(words, score_puzzle)
 
     def do_POST(self) -> None:
         if self.path.endswith("/cruziwords"):
-            csv_string = self.parse_csv_from_post_request()
-
-            words = WordsCorpus.from_csv_string(csv_string)
-            winning_puzzle = search_puzzle(words, score_puzzle)
-            html_out = render_puzzle(winning_puzzle)
-
-            self.send_response(200)
-            self.send_header("content-type", "text/html")
-            self.end_headers()
-            self.wfile.write(html_out.encode())
+            if winning_puzzle := self.generate_puzzle():
+                html_out = render_puzzle(winning_puzzle)
+                self.send_body(html_out.encode(), "text/html; charset=utf-8")
+        elif self.path.endswith("/cruziwords.json"):
+            if winning_puzzle := self.generate_puzzle():
+                json_out = render_puzzle_json(winning_puzzle)
+                self.send_body(json_out.encode(), "application/json")
 
 
 def parse_args() -> argparse.Namespace:
     argp = argparse.ArgumentParser("Cruziwords webserver!")
     argp.add_argument("port", nargs="?", type=int, default=8000, help="Port number where the server should run")
+    argp.add_argument(
+        "--max-upload-size",
+        type=int,
+        default=DEFAULT_MAX_UPLOAD_SIZE,
+        help="Reject uploaded CSV files larger than this many bytes",
+    )
     return argp.parse_args()
 
 
 def start_server() -> None:
-    logging.basicConfig(level=logging.DEBUG, format="%(asctime)s\t%(levelname)s\t%(message)s")
+    configure_logging()
 
     args = parse_args()
     port = args.port
+    CruziwordsHandler.max_upload_size = args.max_upload_size
     server = HTTPServer(("", port), CruziwordsHandler)
     LOGGER.info("Server starting on port %d", port)
     server.serve_forever()
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import csv
 import re
+import zlib
 from pathlib import Path
 from typing import Any, Iterable, Iterator, NamedTuple, Self
 
@@ -28,11 +29,37 @@ def normalize(raw_solution: str) -> str:
 
 class Word(NamedTuple):
     """
-    A word that can be placed on a crossword puzzle, consisting of a clue and a solution.
+    A word that can be placed on a crossword puzzle, consisting of a clue and a solution. The weight expresses how
+    much the user would like to see this word on the puzzle; see `CorpusSampler`. A solution may come with alternative
+    clues, one of which is picked when the word is rendered.
     """
 
     clue: str
     solution: str
+    weight: float = 1.0
+    alt_clues: tuple[str, ...] = ()
+
+    @property
+    def clues(self) -> tuple[str, ...]:
+        return self.clue, *self.alt_clues
+
+    def pick_clue(self) -> str:
+        """
+        :return: One of the clues of this word. The choice only depends on the word itself, so that every rendering of a
+        puzzle (HTML, JSON, re-renders, or updates of it) shows the same clue, while different solutions still draw on
+        different rows of the corpus.
+        """
+        # Not `hash`, which differs between processes
+        return self.clues[zlib.crc32(self.solution.encode()) % len(self.clues)]
+
+    def merge(self, other: Word) -> Word:
+        """
+        :param other: Word with the same solution.
+        :return: A single word carrying the clues of both words, and the larger weight.
+        """
+        clues = dict.fromkeys(self.clues + other.clues)
+        clue, *alt_clues = clues
+        return Word(clue, self.solution, max(self.weight, other.weight), tuple(alt_clues))
 
     def __len__(self) -> int:
         """
@@ -48,6 +75,31 @@ class Word(NamedTuple):
         return self.solution[pos]
 
 
+class LetterIndex:
+    """
+    Index of which words contain which letters, and at which positions. Shared by all corpora derived from the same
+    corpus, so that it's only built once per search.
+
+    Words are indexed in sorted order, rather than in the order of a set, which depends on the hash seed of the process.
+    That way, searches iterating the index are reproducible from their random seed alone.
+    """
+
+    def __init__(self, words: Iterable[Word]):
+        self.occurrences: dict[str, list[tuple[Word, int]]] = {}
+        self.size = 0
+        for word in sorted(words):
+            self.size += 1
+            for i, letter in enumerate(word.solution):
+                self.occurrences.setdefault(letter, []).append((word, i))
+
+    def can_cross(self, word: Word) -> bool:
+        """
+        :return: Whether `word` shares a letter with any other indexed word. If not, it can never be placed on a puzzle
+        together with them.
+        """
+        return any(len(self.occurrences.get(letter, ())) > word.solution.count(letter) for letter in set(word.solution))
+
+
 class WordsCorpus:
     """
     A set of words that can be placed on a crossword puzzle. Used during construction of suitable puzzles.
@@ -55,8 +107,14 @@ class WordsCorpus:
     Designed to be immutable so that it can be used in recursive algorithms.
     """
 
-    def __init__(self, words: Iterable[Word]):
+    def __init__(self, words: Iterable[Word], letter_index: LetterIndex | None = None):
+        """
+        :param words: Words in this corpus.
+        :param letter_index: Letter index covering at least these words. Not expected to be set by caller; corpora
+        derived from this one via `pop` share its index.
+        """
         self.words = set(words)
+        self.letter_index = letter_index if letter_index is not None else LetterIndex(self.words)
 
     def __len__(self) -> int:
         return len(self.words)
@@ -64,6 +122,9 @@ class WordsCorpus:
     def __iter__(self) -> Iterator[Word]:
         return iter(self.words)
 
+    def __contains__(self, word: object) -> bool:
+        return word in self.words
+
     def pop(self, word: Word) -> WordsCorpus:
         """
         :param word: Word to remove from this corpus (signifying that it's been successfully placed on a crossword).
@@ -71,40 +132,73 @@ class WordsCorpus:
         """
         words = self.words.copy()
         words.remove(word)
-        return WordsCorpus(words)
+        return WordsCorpus(words, self.letter_index)
+
+    def placeable(self) -> WordsCorpus:
+        """
+        :return: A new `WordsCorpus` without the words that don't share a letter with any other word in this corpus,
+        and hence can never be placed on a puzzle.
+        """
+        # The shared index may cover words which were popped since; only if not, it tells about this corpus
+        letter_index = self.letter_index if self.letter_index.size == len(self.words) else LetterIndex(self.words)
+        return WordsCorpus((word for word in self.words if letter_index.can_cross(word)), self.letter_index)
 
     def containing(self, letter: str) -> Iterable[tuple[Word, int]]:
         """
         :param letter: Which words contain this letter?
         :return: Yields all words which contain a certain letter, including the position the letter has in that word.
         """
-        for word in self.words:
-            if letter in word.solution:  # This line speeds up the code significantly
-                for i, _letter in enumerate(word.solution):
-                    if _letter == letter:
-                        yield word, i
+        for word, i in self.letter_index.occurrences.get(letter, ()):
+            if word in self.words:
+                yield word, i
 
     @classmethod
-    def from_csv_string(cls, csv_string: str) -> Self:
+    def from_csv_lines(cls, csv_lines: Iterable[str], weighted: bool = False) -> Self:
         """
-        Construct a word corpus from an in-memory CSV file.
-        :param csv_string: A CSV file read in memory.
+        Construct a word corpus from lines of a CSV file. Lines are consumed lazily, so rows can be fed in as they
+        arrive (e.g. from a file object or a network upload) without holding the whole file in memory. Rows with the
+        same (normalized) solution are collapsed into a single word, see `Word.merge`.
+        :param csv_lines: Lines of a CSV file, including or excluding their line terminators.
+        :param weighted: If set, the last column of each row holds the weight of its words.
         """
-        csv_lines = csv_string.splitlines()
         csv_reader = csv.reader(csv_lines)
 
         def words_from_csv() -> Iterable[Word]:
             for row in csv_reader:
+                if not row:
+                    continue
                 definition = row[0]
-                for alt_word in row[1:]:
+                alt_words = row[1:]
+                weight = 1.0
+                if weighted:
+                    try:
+                        weight = float(row[-1])
+                    except ValueError as e:
+                        raise ValueError(f"Invalid weight in CSV line {csv_reader.line_num}: {row[-1]!r}") from e
+                    alt_words = row[1:-1]
+                for alt_word in alt_words:
                     if definition and alt_word:
-                        yield Word(row[0], normalize(alt_word))
+                        yield Word(definition, normalize(alt_word), weight)
+
+        # Rows with the same solution would only lead to identical placements; keep one word carrying all their clues
+        words: dict[str, Word] = {}
+        for word in words_from_csv():
+            existing_word = words.get(word.solution)
+            words[word.solution] = word if existing_word is None else existing_word.merge(word)
 
-        words = words_from_csv()
-        return cls(words)
+        return cls(words.values())
 
     @classmethod
-    def from_csv_file(cls, csv_path: str | Path) -> Self:
+    def from_csv_string(cls, csv_string: str, weighted: bool = False) -> Self:
+        """
+        Construct a word corpus from an in-memory CSV file.
+        :param csv_string: A CSV file read in memory.
+        :param weighted: If set, the last column of each row holds the weight of its words.
+        """
+        return cls.from_csv_lines(csv_string.splitlines(), weighted)
+
+    @classmethod
+    def from_csv_file(cls, csv_path: str | Path, weighted: bool = False) -> Self:
         """
         Construct a word corpus from a CSV file. Clue goes in the first column, and then one or more solutions in the
         following columns. For example:
@@ -112,8 +206,12 @@ class WordsCorpus:
             Capital of Spain,MADRID
             Historic capital of Spain,TOLEDO,CORDOBA
 
+        If `weighted` is set, an additional last column holds the weight of the row's words:
+
+            Capital of Spain,MADRID,2.5
+
         :param csv_path: Path to CSV file.
+        :param weighted: If set, the last column of each row holds the weight of its words.
         """
-        with open(csv_path, "r", encoding="utf-8") as csv_file:
-            csv_string = csv_file.read()
-            return cls.from_csv_string(csv_string)
+        with open(csv_path, "r", encoding="utf-8", newline="") as csv_file:
+            return cls.from_csv_lines(csv_file, weighted)
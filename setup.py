@@ -20,6 +20,7 @@ setuptools.setup(
         "console_scripts": [
             "cruziwords=cruziwords.__main__:main",
             "cruziwords_webserver=cruziwords.webserver.webserver:start_server",
+            "cruziwords_distributed=cruziwords.distributed:main",
         ]
     },
 )
@@ -1,6 +1,6 @@
 import pytest
 
-from cruziwords.words import Word
+from cruziwords.words import Word, WordsCorpus
 
 
 @pytest.fixture
@@ -11,3 +11,13 @@ def kabul() -> Word:
 @pytest.fixture
 def baghdad() -> Word:
     return Word("Capital of Iraq", "BAGHDAD")
+
+
+@pytest.fixture
+def words() -> WordsCorpus:
+    return WordsCorpus([
+        Word("Swedish band", "ABBA"),
+        Word("Female first name", "ANNA"),
+        Word("Italian car brand", "ALFA"),
+        Word("Screaming sound", "AAAA"),
+    ])
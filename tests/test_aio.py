@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from cruziwords.aio import PuzzleGenerator
+from cruziwords.examples import find_examples
+from cruziwords.scoring import count_words, score_puzzle
+from cruziwords.words import WordsCorpus
+
+
+def test_iter_puzzles_improves(words: WordsCorpus):
+    async def collect() -> list:
+        async with PuzzleGenerator({"words": words}) as generator:
+            return [puzzle async for puzzle in generator.iter_puzzles("words")]
+
+    puzzles = asyncio.run(collect())
+    assert count_words(puzzles[0]) == 1
+    assert count_words(puzzles[-1]) == 4
+    scores = [score_puzzle(puzzle) for puzzle in puzzles]
+    assert scores == sorted(scores)
+
+
+def test_generate_unknown_corpus(words: WordsCorpus):
+    async def generate() -> None:
+        async with PuzzleGenerator({"words": words}) as generator:
+            await generator.generate("other")
+
+    with pytest.raises(KeyError):
+        asyncio.run(generate())
+
+
+def test_generate_cancelled(words: WordsCorpus):
+    capitals = WordsCorpus.from_csv_file(find_examples()[0])
+
+    async def generate() -> None:
+        # With a single worker, the second search can only run once the first one has stopped
+        async with PuzzleGenerator({"capitals": capitals, "words": words}, max_workers=1) as generator:
+            task = asyncio.create_task(generator.generate("capitals"))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert count_words(await generator.generate("words", timeout=10)) == 4
+
+    asyncio.run(generate())
+
+
+def test_generate_in_processes(words: WordsCorpus):
+    async def generate() -> None:
+        async with PuzzleGenerator({"words": words}, processes=True, max_workers=1) as generator:
+            for _ in range(2):
+                assert count_words(await generator.generate("words", timeout=30)) == 4
+
+    asyncio.run(generate())
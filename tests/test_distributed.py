@@ -0,0 +1,108 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+
+import pytest
+
+from cruziwords.distributed import (
+    Coordinator,
+    CoordinatorManager,
+    Job,
+    SearchTask,
+    parse_address,
+    parse_args,
+    run_worker,
+    start_coordinator,
+)
+from cruziwords.scoring import count_words
+from cruziwords.words import WordsCorpus
+
+AUTHKEY = b"test"
+
+
+@pytest.fixture
+def job(words: WordsCorpus) -> Job:
+    return Job(list(words), target_words=None)
+
+
+def test_coordinator_reassigns_stale_tasks(job: Job):
+    coordinator = Coordinator(job, [SearchTask(0, 0, 1)], heartbeat_timeout=0)
+    worker_id = coordinator.register_worker()
+
+    assert coordinator.get_task(worker_id) == SearchTask(0, 0, 1)
+    assert coordinator.get_task(worker_id) is None
+
+    assert coordinator.reassign_stale_tasks() == [0]
+    assert coordinator.get_task(worker_id) == SearchTask(0, 0, 1)
+
+
+def test_distributed_search(job: Job):
+    tasks = [SearchTask(i, i, 2) for i in range(6)]
+    with start_coordinator(job, tasks, ("localhost", 0), AUTHKEY, heartbeat_timeout=0.5) as (coordinator, address):
+        # A worker which dies right after taking a task, without ever sending a heartbeat
+        manager = CoordinatorManager(address=address, authkey=AUTHKEY)
+        manager.connect()
+        dead_worker = manager.get_coordinator()
+        dead_worker.get_task(dead_worker.register_worker())
+
+        workers = [
+            multiprocessing.get_context("spawn").Process(
+                target=run_worker, args=(address, AUTHKEY), kwargs={"heartbeat_interval": 0.1, "poll_interval": 0.1}
+            )
+            for _ in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+
+        puzzle = coordinator.wait(poll_interval=0.1)
+        finished_tasks = coordinator.finished_tasks()
+
+    for worker in workers:
+        worker.join(timeout=10)
+        assert worker.exitcode == 0
+
+    assert set(finished_tasks) == {task.task_id for task in tasks}
+    assert count_words(puzzle) == 4
+
+
+def test_parse_address():
+    assert parse_address("example.com:1234") == ("example.com", 1234)
+    assert parse_address(":1234") == ("localhost", 1234)
+
+
+# Runs a search task's search on the example corpus, printing the resulting puzzle
+SEARCH_TASK_SCRIPT = """
+import random
+from cruziwords.examples import find_examples
+from cruziwords.scoring import score_puzzle
+from cruziwords.search import search_puzzle
+from cruziwords.view.json import render_puzzle_json
+from cruziwords.words import WordsCorpus
+
+random.seed(42)
+print(render_puzzle_json(search_puzzle(WordsCorpus.from_csv_file(find_examples()[0]), score_puzzle, 20, 5)))
+"""
+
+
+def test_search_task_reproducible():
+    # Workers run in different processes, which hash (and hence iterate sets of) words differently
+    puzzles = {
+        subprocess.run(
+            [sys.executable, "-c", SEARCH_TASK_SCRIPT],
+            capture_output=True,
+            check=True,
+            text=True,
+            env={**os.environ, "PYTHONHASHSEED": hash_seed},
+        ).stdout
+        for hash_seed in ("1", "2", "3")
+    }
+
+    assert len(puzzles) == 1
+
+
+def test_parse_args_rejects_no_tasks(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(sys, "argv", ["cruziwords_distributed", "coordinator", "words.csv", "--tasks", "0"])
+
+    with pytest.raises(SystemExit):
+        parse_args()
@@ -0,0 +1,80 @@
+import pytest
+
+from cruziwords.fill import FillError, Slot, Template, TemplateError, fill_template
+from cruziwords.puzzle import Direction, Letter, Position, WordStart
+from cruziwords.scoring import count_checked_squares, count_words
+from cruziwords.words import Word, WordsCorpus
+
+
+@pytest.fixture
+def template() -> Template:
+    return Template.from_string("#vv\n>..\n>..")
+
+
+@pytest.fixture
+def words() -> WordsCorpus:
+    return WordsCorpus(
+        [
+            Word("Abbreviation", "AB"),
+            Word("Compact disc", "CD"),
+            Word("Alternating current", "AC"),
+            Word("Board", "BD"),
+        ]
+    )
+
+
+def test_template_slots(template: Template):
+    assert set(template.slots) == {
+        Slot(Position(1, 0), Direction.DOWN, 2),
+        Slot(Position(2, 0), Direction.DOWN, 2),
+        Slot(Position(0, 1), Direction.ACROSS, 2),
+        Slot(Position(0, 2), Direction.ACROSS, 2),
+    }
+    assert template.letters == {Position(col, row): None for col in (1, 2) for row in (1, 2)}
+
+
+@pytest.mark.parametrize("template_string", [">", "#v#\n>.#\n...", "#vv\n>.?", "#vv\n>.b\n>.."])
+def test_invalid_template(template_string: str):
+    with pytest.raises(TemplateError):
+        Template.from_string(template_string)
+
+
+def test_fill_template(template: Template, words: WordsCorpus):
+    puzzle = fill_template(template, words)
+
+    assert count_words(puzzle) == 4
+    assert count_checked_squares(puzzle) == 4
+    assert {square.word for _, square in puzzle if type(square) is WordStart} == set(words)
+    assert type(puzzle[1, 1]) is Letter and puzzle[1, 1].letter == "A"
+
+
+def test_fill_template_given_letters(words: WordsCorpus):
+    template = Template.from_string("#vv\n>.B\n>..")
+    puzzle = fill_template(template, words)
+
+    # With B in the top right corner, only one fill remains
+    assert [puzzle[col, row].letter for row in (1, 2) for col in (1, 2)] == ["A", "B", "C", "D"]
+
+
+def test_fill_template_impossible(words: WordsCorpus):
+    with pytest.raises(FillError):
+        fill_template(Template.from_string("#vv\n>Z.\n>.."), words)
+
+    with pytest.raises(FillError):
+        fill_template(Template.from_string("#vvv\n>...\n>..."), words)
+
+
+def test_fill_template_shared_solution(template: Template, words: WordsCorpus):
+    words = WordsCorpus([*words, Word("Alberta", "AB")])
+
+    clues = set()
+    for _ in range(10):
+        puzzle = fill_template(template, words)
+        clues |= {
+            square.word.pick_clue()
+            for _, square in puzzle
+            if type(square) is WordStart and square.word.solution == "AB"
+        }
+
+    # Both words with solution AB fill the same slot; every fill shows the same one of their clues
+    assert len(clues) == 1
@@ -0,0 +1,59 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from cruziwords.view.json import load_puzzle_json
+
+# Budget for importing the CLI entry point, in microseconds. Importing Mako alone used to take longer than this.
+IMPORT_TIME_BUDGET_US = 150_000
+
+
+def import_times(module: str) -> dict[str, int]:
+    """
+    :return: Cumulative import time in microseconds for each module imported along with `module`.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_main_import_is_lazy():
+    times = import_times("cruziwords.__main__")
+
+    assert "mako.template" not in times
+    assert "markupsafe" not in times
+    assert times["cruziwords.__main__"] < IMPORT_TIME_BUDGET_US
+
+
+def run_main(*args: str | Path) -> None:
+    subprocess.run(
+        [sys.executable, "-c", "from cruziwords.__main__ import main; main()", *map(str, args), "--quiet"],
+        capture_output=True,
+        check=True,
+    )
+
+
+def test_main_updates_puzzle_in_place(tmp_path: Path):
+    csv_path = tmp_path / "words.csv"
+    csv_path.write_text("Swedish band,ABBA\nFemale first name,ANNA\nItalian car brand,ALFA\n", encoding="utf-8")
+    puzzle_path = tmp_path / "puzzle.json"
+    run_main(csv_path, "--json-out", puzzle_path)
+    previous_puzzle = load_puzzle_json(puzzle_path.read_text(encoding="utf-8"))
+
+    with csv_path.open("a", encoding="utf-8") as csv_file:
+        csv_file.write("Screaming sound,AAAA\n")
+    run_main(csv_path, "--update", puzzle_path, "--json-out", puzzle_path)
+    puzzle = load_puzzle_json(puzzle_path.read_text(encoding="utf-8"))
+
+    assert previous_puzzle.placed_words < puzzle.placed_words
+    assert {word.solution for word in puzzle.placed_words} == {"ABBA", "ANNA", "ALFA", "AAAA"}
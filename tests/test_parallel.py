@@ -0,0 +1,45 @@
+import multiprocessing
+
+from cruziwords.parallel import SharedState, SubtreeExplorer, parallel_search_puzzle
+from cruziwords.scoring import count_words, score_puzzle
+from cruziwords.search import start_search
+from cruziwords.words import WordsCorpus
+
+
+def test_parallel_search(words: WordsCorpus):
+    # Test that these words are successfully arranged into a square
+    puzzle = parallel_search_puzzle(words, score_puzzle, workers=2)
+    assert puzzle.width == 5
+    assert puzzle.height == 5
+    assert count_words(puzzle) == 4
+
+
+def test_parallel_search_max_iterations(words: WordsCorpus):
+    puzzle = parallel_search_puzzle(words, score_puzzle, max_iterations=1, workers=2)
+    assert count_words(puzzle) > 1
+
+
+def test_idle_worker_explores_shared_subtree(words: WordsCorpus):
+    words, start_puzzle = start_search(words)
+    context = multiprocessing.get_context("spawn")
+    state = SharedState(
+        subtrees=context.Queue(),
+        results=context.Queue(),
+        pending=context.Value("i", 1),
+        idle=context.Value("i", 1),
+        best_score=context.Value("d", float("-inf")),
+        iterations=context.Value("i", 0),
+        stop=context.Event(),
+    )
+
+    # With another worker idle, the siblings of each subtree the first worker descends into are shared
+    SubtreeExplorer(words, score_puzzle, None, state).explore(words, start_puzzle, 0)
+    assert state.pending.value > 1
+    iterations = state.iterations.value
+    state.pending.value -= 1
+    state.idle.value = 0
+
+    # Another worker explores all of them, until no subtree is pending anymore
+    SubtreeExplorer(words, score_puzzle, None, state).run()
+    assert state.pending.value == 0
+    assert state.iterations.value > iterations
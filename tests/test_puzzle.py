@@ -69,3 +69,31 @@ def test_add_word_intersection(kabul: Word, baghdad: Word):
 
     assert puzzle[0, 0].letter == "A"
     assert len(puzzle[0, 0].words) == 2
+
+
+def test_anchors(kabul: Word, baghdad: Word):
+    puzzle = Puzzle().add_word(kabul, Position(-2, 0), Direction.ACROSS)
+
+    assert puzzle.anchors["A"] == {Position(0, 0): Direction.DOWN}
+    assert set(puzzle.anchors) == set("KABUL")
+
+    crossed_puzzle = puzzle.add_word(baghdad, Position(0, -2), Direction.DOWN)
+
+    # The crossed square is no longer an anchor, but the other A of BAGHDAD is
+    assert crossed_puzzle.anchors["A"] == {Position(0, 4): Direction.ACROSS}
+    assert crossed_puzzle.anchors["B"] == {Position(1, 0): Direction.DOWN, Position(0, -1): Direction.ACROSS}
+
+    # The original puzzle is unchanged
+    assert puzzle.anchors["A"] == {Position(0, 0): Direction.DOWN}
+
+    # The index built from scratch matches the incrementally maintained one
+    assert Puzzle(dict(crossed_puzzle)).anchors == crossed_puzzle.anchors
+
+
+def test_placed_words(kabul: Word, baghdad: Word):
+    puzzle = Puzzle().add_word(kabul, Position(-2, 0), Direction.ACROSS)
+    crossed_puzzle = puzzle.add_word(baghdad, Position(0, -2), Direction.DOWN)
+
+    assert puzzle.placed_words == {kabul}
+    assert crossed_puzzle.placed_words == {kabul, baghdad}
+    assert Puzzle(dict(crossed_puzzle)).placed_words == crossed_puzzle.placed_words
@@ -0,0 +1,52 @@
+from cruziwords.puzzle import Direction, Position, Puzzle
+from cruziwords.sampling import CorpusSampler
+from cruziwords.scoring import count_words, score_puzzle
+from cruziwords.search import search_puzzle
+from cruziwords.words import Word, WordsCorpus
+
+
+def test_sampler_weights(kabul: Word, baghdad: Word):
+    unwanted = Word("Capital of Iraq", "BAGHDAD", weight=0)
+    words = WordsCorpus([kabul, baghdad, unwanted])
+    sampler = CorpusSampler(words, target_words=1)
+
+    assert set(sampler.initial()) == {kabul, baghdad}
+    assert not sampler.reserve
+
+
+def test_sampler_refill(kabul: Word, baghdad: Word):
+    words = WordsCorpus([Word(f"Clue {i}", solution) for i in range(10) for solution in ("KABUL", "BAGHDAD")])
+    sampler = CorpusSampler(words, target_words=2)
+
+    assert len(sampler.initial()) == 6
+
+    puzzle = Puzzle().add_word(kabul, Position(0, 0), Direction.ACROSS)
+    assert not sampler.is_complete(puzzle)
+    assert len(sampler.refill(puzzle, WordsCorpus([]))) == 5
+
+    puzzle = puzzle.add_word(baghdad, Position(2, -2), Direction.DOWN)
+    assert sampler.is_complete(puzzle)
+
+
+def test_search_with_target_words():
+    words = WordsCorpus([Word(f"Clue {i}", f"{letter}ABA") for i in range(20) for letter in "ABCDE"])
+    puzzle = search_puzzle(words, score_puzzle, max_iterations=5, target_words=5)
+
+    assert count_words(puzzle) == 5
+
+
+def test_sampler_puts_back_words(kabul: Word, baghdad: Word):
+    rome = Word("Capital of Italy", "ROME")
+    sampler = CorpusSampler(WordsCorpus([kabul, baghdad, rome]), target_words=1)
+    assert set(sampler.initial()) == {kabul, baghdad, rome}
+
+    # ROME can't be placed yet, but may be drawn again later
+    puzzle = Puzzle().add_word(kabul, Position(0, 0), Direction.ACROSS)
+    assert sampler.refill(puzzle, WordsCorpus([rome])) is None
+    assert sampler.reserve == [rome]
+    assert set(sampler.refill(puzzle, WordsCorpus([])) or ()) == {rome}
+
+    # Words on the puzzle are never drawn again
+    sampler.put_back([kabul, baghdad])
+    assert set(sampler.refill(puzzle, WordsCorpus([])) or ()) == {baghdad}
+    assert sampler.reserve == [kabul]
@@ -1,22 +1,81 @@
-import pytest
-
-from cruziwords.search import search_puzzle
-from cruziwords.scoring import score_puzzle
+from cruziwords.puzzle import Direction, Letter, Position, Puzzle, WordStart
+from cruziwords.search import iter_best_puzzles, regenerate_puzzle, search_puzzle, start_search
+from cruziwords.scoring import count_words, score_puzzle
 from cruziwords.words import Word, WordsCorpus
 
 
-@pytest.fixture
-def words():
-    return WordsCorpus([
-        Word("Swedish band", "ABBA"),
-        Word("Female first name", "ANNA"),
-        Word("Italian car brand", "ALFA"),
-        Word("Screaming sound", "AAAA"),
-    ])
-
-
 def test_search(words: WordsCorpus):
     # Test that these words are successfully arranged into a square
     puzzle = search_puzzle(words, score_puzzle)
     assert puzzle.width == 5
     assert puzzle.height == 5
+
+
+def test_search_drops_uncrossable_words(words: WordsCorpus):
+    words = WordsCorpus([*words, Word("Capital of Italy", "ROME")])
+    puzzle = search_puzzle(words, score_puzzle)
+    assert count_words(puzzle) == 4
+
+
+def test_start_search(words: WordsCorpus):
+    words = WordsCorpus([*words, Word("Capital of Italy", "ROME"), Word("Exclamation", "AH")])
+    remaining_words, puzzle = start_search(words)
+    # ROME can't cross any other word, and is dropped
+    assert len(remaining_words) == 4
+    assert Word("Capital of Italy", "ROME") not in remaining_words
+    assert puzzle.placed_words.isdisjoint(remaining_words)
+    assert len(puzzle.placed_words) == 1
+
+
+def test_regenerate_puzzle(words: WordsCorpus):
+    puzzle = search_puzzle(words, score_puzzle)
+
+    edited_words = WordsCorpus([
+        *(word for word in words if word.solution != "ALFA"),
+        Word("Cake", "BABA"),
+    ])
+    new_puzzle = regenerate_puzzle(puzzle, edited_words, score_puzzle)
+
+    solutions = {word.solution for word in new_puzzle.placed_words}
+    assert "ALFA" not in solutions
+    assert {"ABBA", "ANNA", "AAAA"} <= solutions
+
+    # Words which are still in the corpus stay where they were
+    for pos, square in puzzle:
+        if type(square) is WordStart and square.word.solution != "ALFA":
+            new_square = new_puzzle[pos]
+            assert type(new_square) is WordStart
+            assert (new_square.word.solution, new_square.dir) == (square.word.solution, square.dir)
+
+
+def test_search_stops(words: WordsCorpus):
+    checks = 0
+
+    def should_stop() -> bool:
+        nonlocal checks
+        checks += 1
+        return checks > 1
+
+    # Only the root is expanded; each of its (at most 3) children stops the search before being expanded
+    puzzles = list(iter_best_puzzles(words, score_puzzle, should_stop=should_stop))
+    assert len(puzzles) == 1
+    assert 1 < checks <= 4
+
+
+def test_regenerate_puzzle_removing_bridge():
+    top = Word("Swedish band", "ABBA")
+    bridge = Word("Male first name", "BOB")
+    bottom = Word("Sheep sounds", "BAAB")
+    puzzle = (
+        Puzzle()
+        .add_word(top, Position(-1, 0), Direction.ACROSS)
+        .add_word(bridge, Position(1, -1), Direction.DOWN)
+        .add_word(bottom, Position(0, 2), Direction.ACROSS)
+    )
+
+    new_puzzle = regenerate_puzzle(puzzle, WordsCorpus([top, bottom]), score_puzzle)
+
+    # The two remaining words would be islands; one of them stays put, and the other is placed crossing it
+    assert new_puzzle.placed_words == {top, bottom}
+    assert new_puzzle[-1, 0] == puzzle[-1, 0] or new_puzzle[0, 2] == puzzle[0, 2]
+    assert any(type(square) is Letter and len(square.words) == 2 for _, square in new_puzzle)
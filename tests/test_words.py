@@ -58,3 +58,55 @@ def test_corpus_normalization(words_csv: Path):
     assert any(word.solution == "ESPAÑA" for word in words)
     assert any(word.solution == "ETRE" for word in words)
     assert any(word.solution == "LAEUSE" for word in words)
+
+
+def test_words_from_csv_lines():
+    lines = iter(["Capital of Afghanistan,KABUL\n", "\n", "European Capital,BERLIN,MADRID\n"])
+    words = WordsCorpus.from_csv_lines(lines)
+
+    assert {word.solution for word in words} == {"KABUL", "BERLIN", "MADRID"}
+
+
+def test_letter_index(kabul: Word, baghdad: Word):
+    words = WordsCorpus([kabul, baghdad])
+
+    assert set(words.letter_index.occurrences["A"]) == {(baghdad, 1), (baghdad, 5), (kabul, 1)}
+    assert "X" not in words.letter_index.occurrences
+
+
+def test_placeable(kabul: Word, baghdad: Word):
+    rome = Word("Capital of Italy", "ROME")
+    words = WordsCorpus([kabul, baghdad, rome])
+
+    assert not words.letter_index.can_cross(rome)
+    assert set(words.placeable()) == {kabul, baghdad}
+    assert words.pop(kabul).letter_index is words.letter_index
+
+    # Once BAGHDAD is placed, nothing's left for KABUL to cross
+    assert not words.pop(baghdad).placeable()
+
+
+def test_weighted_words():
+    words = WordsCorpus.from_csv_string("Capital of Afghanistan,KABUL,2.5\nEuropean Capital,BERLIN,MADRID,0", weighted=True)
+
+    assert {(word.solution, word.weight) for word in words} == {("KABUL", 2.5), ("BERLIN", 0), ("MADRID", 0)}
+
+    with pytest.raises(ValueError):
+        WordsCorpus.from_csv_string("Capital of Afghanistan,KABUL", weighted=True)
+
+
+def test_duplicate_solutions_are_collapsed():
+    words = WordsCorpus.from_csv_string(
+        "Capital of Germany,BERLIN\nEuropean Capital,Berlin,MADRID\nCapital of Spain,Madríd\nCapital of Germany,BERLIN"
+    )
+
+    assert len(words) == 2
+    berlin = next(word for word in words if word.solution == "BERLIN")
+    assert berlin.clues == ("Capital of Germany", "European Capital")
+    assert berlin.pick_clue() in berlin.clues
+
+
+def test_merge_words():
+    word = Word("Capital of Germany", "BERLIN", 0.5).merge(Word("European Capital", "BERLIN", 2.0))
+
+    assert word == Word("Capital of Germany", "BERLIN", 2.0, ("European Capital",))
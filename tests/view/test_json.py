@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from cruziwords.puzzle import Direction, Position, Puzzle
+from cruziwords.view.json import decode_puzzle, encode_puzzle, load_puzzle_json, render_puzzle_json
+from cruziwords.words import Word
+
+
+def test_encode_puzzle(kabul: Word, baghdad: Word):
+    puzzle = (
+        Puzzle()
+        .add_word(kabul, Position(-2, 0), Direction.ACROSS)
+        .add_word(baghdad, Position(0, -2), Direction.DOWN)
+    )
+
+    encoded = encode_puzzle(puzzle)
+
+    assert (encoded["width"], encoded["height"]) == (6, 8)
+    assert encoded["grid"][:3] == ["..#...", "..B...", "#KABUL"]
+    assert {"col": 0, "row": 2, "dir": "across", "length": 5, "clue": kabul.clue} in encoded["clues"]
+    assert {"col": 2, "row": 0, "dir": "down", "length": 7, "clue": baghdad.clue} in encoded["clues"]
+
+    assert json.loads(render_puzzle_json(puzzle)) == encoded
+
+
+def test_decode_puzzle(kabul: Word, baghdad: Word):
+    puzzle = (
+        Puzzle()
+        .add_word(kabul, Position(-2, 0), Direction.ACROSS)
+        .add_word(baghdad, Position(0, -2), Direction.DOWN)
+    )
+
+    decoded = load_puzzle_json(render_puzzle_json(puzzle))
+
+    assert decoded.placed_words == {kabul, baghdad}
+    assert encode_puzzle(decoded) == encode_puzzle(puzzle)
+
+    with pytest.raises(ValueError):
+        decode_puzzle({"grid": ["#A"], "clues": [{"col": 0, "row": 0, "dir": "across", "length": 2, "clue": "?"}]})
+
+
+def test_encode_puzzle_alternative_clues():
+    word = Word("Capital of Germany", "BERLIN", alt_clues=("European capital", "City on the Spree"))
+    puzzle = Puzzle().add_word(word, Position(0, 0), Direction.ACROSS)
+
+    # Every rendering shows the same clue
+    clues = {encode_puzzle(puzzle)["clues"][0]["clue"] for _ in range(10)}
+    assert clues == {word.pick_clue()}
@@ -0,0 +1,21 @@
+import threading
+from http.server import HTTPServer
+
+import pytest
+
+from cruziwords.webserver.webserver import CruziwordsHandler
+
+
+class QuietHandler(CruziwordsHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = HTTPServer(("localhost", 0), QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://localhost:{server.server_port}"
+    server.shutdown()
+    server.server_close()
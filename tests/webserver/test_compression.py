@@ -0,0 +1,30 @@
+import gzip
+import zlib
+
+import pytest
+
+from cruziwords.webserver.compression import compress, negotiate_encoding
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        (None, None),
+        ("", None),
+        ("identity", None),
+        ("gzip, deflate, br", "gzip"),
+        ("deflate", "deflate"),
+        ("gzip;q=0.5, deflate", "deflate"),
+        ("gzip;q=0, *", "deflate"),
+        ("*;q=0", None),
+    ],
+)
+def test_negotiate_encoding(accept_encoding: str | None, expected: str | None):
+    assert negotiate_encoding(accept_encoding) == expected
+
+
+def test_compress():
+    body = b"<td></td>" * 100
+
+    assert gzip.decompress(compress(body, "gzip")) == body
+    assert zlib.decompress(compress(body, "deflate")) == body
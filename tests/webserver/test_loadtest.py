@@ -0,0 +1,38 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from cruziwords.webserver.loadtest import percentile, read_rss, request_mix, run_load
+
+
+@pytest.fixture
+def corpus(tmp_path) -> Path:
+    csv_file = tmp_path / "words.csv"
+    csv_file.write_text("Swedish band,ABBA\nFemale first name,ANNA\nItalian car brand,ALFA\n", encoding="utf-8")
+    return csv_file
+
+
+def test_run_load(server_url: str, corpus: Path):
+    requests = request_mix([corpus], post_ratio=0.5)
+    report = run_load(server_url, requests, concurrency=2, total_requests=10, server_pid=os.getpid())
+
+    assert report.requests == 10
+    assert report.errors == 0
+    assert 0 < report.p50 <= report.p95 <= report.p99
+    assert report.max_rss is None or report.max_rss > 0
+
+
+def test_percentile():
+    values = [float(i) for i in range(1, 101)]
+
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.95) == 95
+    assert percentile(values, 0.99) == 99
+    assert percentile(values, 1) == 100
+    assert percentile(values, 0) == 1
+    assert percentile([], 0.5) == 0
+
+
+def test_read_rss_missing_process():
+    assert read_rss(-1) is None
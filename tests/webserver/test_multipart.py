@@ -0,0 +1,69 @@
+from io import BytesIO
+
+import pytest
+
+from cruziwords.webserver.multipart import MultipartError, MultipartReader, UploadTooLarge
+from cruziwords.words import WordsCorpus
+
+BOUNDARY = "----cruziwords"
+
+
+def multipart_body(fields: dict[str, bytes]) -> bytes:
+    parts = []
+    for name, content in fields.items():
+        parts.append(
+            f"--{BOUNDARY}\r\n"
+            f'Content-Disposition: form-data; name="{name}"; filename="{name}.csv"\r\n'
+            "Content-Type: text/csv\r\n"
+            "\r\n".encode()
+            + content
+            + b"\r\n"
+        )
+    return b"".join(parts) + f"--{BOUNDARY}--\r\n".encode()
+
+
+def reader_for(body: bytes, max_size: int = 1024) -> MultipartReader:
+    return MultipartReader(BytesIO(body), BOUNDARY, len(body), max_size)
+
+
+def test_iter_field_lines():
+    body = multipart_body(
+        {
+            "submit": b"Submit",
+            "file": "Capital of Afghanistan,KABUL\r\nSpain in Spanish,españa".encode(),
+        }
+    )
+
+    lines = list(reader_for(body).iter_field_lines("file"))
+
+    assert lines == ["Capital of Afghanistan,KABUL\r\n", "Spain in Spanish,españa"]
+
+
+def test_words_from_upload():
+    body = multipart_body({"file": b"European Capital,BERLIN,MADRID\n\nCapital of Iraq,BAGHDAD\n"})
+
+    words = WordsCorpus.from_csv_lines(reader_for(body).iter_field_lines("file"))
+
+    assert {word.solution for word in words} == {"BERLIN", "MADRID", "BAGHDAD"}
+
+
+def test_upload_too_large():
+    body = multipart_body({"file": b"Capital of Afghanistan,KABUL"})
+
+    with pytest.raises(UploadTooLarge):
+        reader_for(body, max_size=len(body) - 1)
+
+
+def test_missing_field():
+    body = multipart_body({"submit": b"Submit"})
+
+    with pytest.raises(MultipartError):
+        list(reader_for(body).iter_field_lines("file"))
+
+
+def test_truncated_body():
+    body = multipart_body({"file": b"Capital of Afghanistan,KABUL"})
+    truncated_body = body[: -len(f"--{BOUNDARY}--\r\n")]
+
+    with pytest.raises(MultipartError):
+        list(MultipartReader(BytesIO(truncated_body), BOUNDARY, len(body), 1024).iter_field_lines("file"))
@@ -0,0 +1,39 @@
+import urllib.error
+import urllib.request
+from http import HTTPStatus
+
+import pytest
+
+from .test_multipart import BOUNDARY, multipart_body
+
+
+def post_csv(url: str, csv_content: bytes) -> int:
+    request = urllib.request.Request(
+        url,
+        data=multipart_body({"file": csv_content}),
+        headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def test_generate_puzzle(server_url: str):
+    status = post_csv(f"{server_url}/cruziwords.json", b"Swedish band,ABBA\nFemale first name,ANNA\n")
+    assert status == HTTPStatus.OK
+
+
+@pytest.mark.parametrize(
+    "csv_content",
+    [
+        b"",
+        b"Only a clue\n",
+        # Longer than the csv module's field size limit
+        b"Long word," + b"A" * 200_000,
+    ],
+)
+def test_generate_puzzle_invalid_csv(server_url: str, csv_content: bytes):
+    status = post_csv(f"{server_url}/cruziwords.json", csv_content)
+    assert status == HTTPStatus.BAD_REQUEST